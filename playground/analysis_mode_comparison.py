@@ -0,0 +1,89 @@
+"""
+Compares the full and fast analysis modes on latency, token use and cost.
+
+Each transcript file is a JSON list of [start_time, end_time, speaker_id, text]
+segments, e.g. the `transcript` state key of a finished session. The full mode
+runs intent, sentiment and root cause concurrently as the pipeline does; the
+fast mode makes its single structured call. The report generation is the same
+in both modes and is left out.
+
+Usage (from the repository root, with the API keys in .env):
+    python playground/analysis_mode_comparison.py transcript.json [more.json ...]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "sage"))
+
+from manager_agent.sub_agents.fast_analysis_agent.agent import analyze_call
+from manager_agent.sub_agents.intent_agent.agent import classify_intent
+from manager_agent.sub_agents.prompt_context import usage_report
+from manager_agent.sub_agents.root_cause_agent.agent import find_root_cause
+from manager_agent.sub_agents.sentiment_agent.agent import score_sentiment
+
+# USD per million tokens: (uncached input, cached input, output). Edit to match your account.
+PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gemma-3-27b-it": (0.0, 0.0, 0.0),
+}
+STEP_MODELS = {
+    "intent": "gemma-3-27b-it",
+    "root_cause": "gemma-3-27b-it",
+    "sentiment": "gpt-4o",
+    "fast_analysis": "gpt-4o",
+}
+
+
+def cost(report):
+    """Estimates the USD cost of the steps in a usage report."""
+    total = 0.0
+    for name, step in report.items():
+        if name == "total":
+            continue
+        uncached, cached, output = PRICES[STEP_MODELS[name]]
+        total += (step["uncached_tokens"] * uncached + step["cached_tokens"] * cached
+                  + step["completion_tokens"] * output) / 1e6
+    return total
+
+
+async def run_full(transcript):
+    usage = {}
+    start = time.perf_counter()
+    intent, sentiment, root_cause = await asyncio.gather(
+        classify_intent(transcript, usage),
+        score_sentiment(transcript, usage=usage),
+        find_root_cause(transcript, usage),
+    )
+    return time.perf_counter() - start, usage_report(usage), intent, sentiment
+
+
+async def run_fast(transcript):
+    usage = {}
+    start = time.perf_counter()
+    intent, root_cause, sentiment = await analyze_call(transcript, usage)
+    return time.perf_counter() - start, usage_report(usage), intent, sentiment
+
+
+async def main(paths):
+    print(f"{'file':30} {'mode':5} {'seconds':>8} {'calls':>5} {'prompt':>8} {'cached':>7} "
+          f"{'output':>7} {'cost $':>8}  intent / overall sentiment")
+    for path in paths:
+        with open(path) as f:
+            transcript = json.load(f)
+        for mode, run in (("full", run_full), ("fast", run_fast)):
+            elapsed, report, intent, sentiment = await run(transcript)
+            total = report["total"]
+            print(
+                f"{os.path.basename(path)[:30]:30} {mode:5} {elapsed:8.2f} {total['calls']:5d} "
+                f"{total['prompt_tokens']:8d} {total['cached_tokens']:7d} {total['completion_tokens']:7d} "
+                f"{cost(report):8.4f}  {intent} / {sentiment['sentiment_overall']}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,74 @@
+"""
+Guards SAGE cold-start time by profiling imports with `python -X importtime`.
+
+Each module is imported in a fresh interpreter from the sage directory, the
+way `streamlit run app.py`, `main.py` and the container entry point load it.
+The check fails if a heavy local-inference or client SDK module is imported
+eagerly, or if the total import time exceeds the budget.
+
+Usage (from the repository root):
+    python playground/import_time_check.py [--budget SECONDS] [--top N] [module ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+SAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sage")
+DEFAULT_MODULES = [
+    "manager_agent.agent",
+    "manager_agent.sub_agents.audio_to_transcript_agent.ingest",
+]
+# Only the local backend and the direct model calls may pull these in, on first use.
+LAZY_MODULES = ["torch", "torchaudio", "whisper", "pyannote.audio", "google.generativeai"]
+
+
+def profile_import(module):
+    """Imports `module` in a fresh interpreter and returns {module: (self_us, cumulative_us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SAGE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget", type=float, default=float(os.getenv("SAGE_IMPORT_BUDGET_SECONDS", "8")))
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        timings = profile_import(module)
+        total = timings[module][1] / 1e6
+        print(f"{module}: {total:.2f}s cumulative")
+        for name, (self_us, cumulative_us) in sorted(timings.items(), key=lambda item: -item[1][1])[1:args.top + 1]:
+            print(f"    {cumulative_us / 1e6:7.3f}s  {name}")
+
+        eager = [name for name in LAZY_MODULES if name in timings]
+        if eager:
+            print(f"  FAIL: imported eagerly: {', '.join(eager)}")
+            failed = True
+        if total > args.budget:
+            print(f"  FAIL: over the {args.budget:.1f}s budget")
+            failed = True
+        print()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Checks that the intent, sentiment and root cause analysis calls overlap in time.
+
+Every model call is replaced with a fake that sleeps for DELAY seconds without
+blocking the event loop. The sample transcript fits in a single minute, so
+each direct analysis function makes one call: run concurrently they take about
+one DELAY, while a blocking branch pushes it towards the sum of all calls.
+
+The second check runs the real `analysis_agents` ParallelAgent through an ADK
+Runner, with every agent's model replaced by SlowLlm. The sentiment and root
+cause agents each take three calls (tool call, the tool's own model call,
+final answer) and the intent agent one, so the branches finish in about three
+DELAYs when they overlap and seven when they run one after the other.
+
+Run from the repository root:
+    python playground/parallel_overlap_check.py
+"""
+import asyncio
+import os
+import sys
+import time
+from typing import AsyncGenerator, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "sage"))
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from manager_agent import agent as manager_module
+from manager_agent.sub_agents.intent_agent import agent as intent_module
+from manager_agent.sub_agents.root_cause_agent import agent as root_cause_module
+from manager_agent.sub_agents.sentiment_agent import agent as sentiment_module
+
+DELAY = 1.0
+
+TRANSCRIPT = [
+    [0.0, 4.0, "A", "Hi, I lost my debit card yesterday."],
+    [4.5, 9.0, "B", "I'm sorry to hear that, let me block it for you."],
+    [9.5, 12.0, "A", "Thank you, that's a relief."],
+]
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, text):
+        self.text = text
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(DELAY)
+        return FakeResponse(self.text)
+
+    def generate_content(self, prompt):
+        time.sleep(DELAY)
+        return FakeResponse(self.text)
+
+
+async def fake_acompletion(model, messages, **kwargs):
+    await asyncio.sleep(DELAY)
+    return {"choices": [{"message": {"content": '{"label": "Calm", "score": 0.8}'}}]}
+
+
+# (model, start, end) of every SlowLlm call, in completion order.
+LLM_CALLS = []
+
+
+class SlowLlm(BaseLlm):
+    """An agent model that sleeps for DELAY, calls its tool once if it has one, then answers."""
+
+    reply: str
+    tool: Optional[str] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        start = time.perf_counter()
+        await asyncio.sleep(DELAY)
+        LLM_CALLS.append((self.model, start, time.perf_counter()))
+        tool_answered = any(
+            part.function_response
+            for content in llm_request.contents
+            for part in content.parts or []
+        )
+        if self.tool and not tool_answered:
+            part = types.Part(function_call=types.FunctionCall(name=self.tool, args={}))
+        else:
+            part = types.Part(text=self.reply)
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def overlaps(a, b):
+    return a[1] < b[2] and b[1] < a[2]
+
+
+async def check_direct_calls():
+    start = time.perf_counter()
+    intent, sentiment, root_cause = await asyncio.gather(
+        intent_module.classify_intent(TRANSCRIPT),
+        sentiment_module.score_sentiment(TRANSCRIPT),
+        root_cause_module.find_root_cause(TRANSCRIPT),
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"intent={intent} sentiment={sentiment['sentiment_overall']} root_cause={root_cause}")
+    print(f"elapsed: {elapsed:.2f}s (serial would be {3 * DELAY:.2f}s)")
+    assert elapsed < 2 * DELAY, "analysis branches did not overlap"
+    print("OK: analysis branches overlap")
+
+
+async def check_parallel_agent():
+    # The ParallelAgent inside the full branch of the analysis mode router.
+    analysis_agents = manager_module.sage_workflow.sub_agents[1].full
+    intent_module.intent_agent.model = SlowLlm(model="slow-intent", reply="ReportLostOrStolenCard")
+    sentiment_module.sentiment_agent.model = SlowLlm(
+        model="slow-sentiment", reply="Sentiment saved.", tool="analyze_sentiment_per_minute"
+    )
+    root_cause_module.root_cause_agent.model = SlowLlm(
+        model="slow-root-cause", reply="Root cause saved.", tool="analyze_root_cause"
+    )
+
+    session_service = InMemorySessionService()
+    session = await session_service.create_session(
+        app_name="overlap_check", user_id="check", state={"transcript": TRANSCRIPT}
+    )
+    runner = Runner(agent=analysis_agents, app_name="overlap_check", session_service=session_service)
+    message = types.Content(role="user", parts=[types.Part(text="Analyze the call.")])
+
+    start = time.perf_counter()
+    async for _ in runner.run_async(user_id="check", session_id=session.id, new_message=message):
+        pass
+    elapsed = time.perf_counter() - start
+
+    session = await session_service.get_session(app_name="overlap_check", user_id="check", session_id=session.id)
+    print(f"intent={session.state.get('intent_state')} root_cause={session.state.get('root_cause_state')}")
+    print(f"elapsed: {elapsed:.2f}s (serial would be {7 * DELAY:.2f}s)")
+    intent_calls = [call for call in LLM_CALLS if call[0] == "slow-intent"]
+    other_calls = [call for call in LLM_CALLS if call[0] != "slow-intent"]
+    assert intent_calls, "the intent agent did not call its model"
+    assert any(overlaps(intent_calls[0], call) for call in other_calls), \
+        "the intent agent's model call did not overlap the other branches"
+    assert elapsed < 4 * DELAY, "analysis_agents branches did not overlap"
+    print("OK: analysis_agents branches overlap, including the intent agent's model call")
+
+
+async def main():
+    intent_module.get_model = lambda: FakeModel("ReportLostOrStolenCard")
+    root_cause_module.get_model = lambda: FakeModel('{"root_cause": "Lost debit card"}')
+    sentiment_module.acompletion = fake_acompletion
+    # Keep the sentiment minute on the (fake) model and the intent on the agent's model,
+    # so every branch makes its calls.
+    sentiment_module.SENTIMENT_SCORER = "llm"
+    intent_module.INTENT_CLASSIFIER = "llm"
+
+    await check_direct_calls()
+    await check_parallel_agent()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
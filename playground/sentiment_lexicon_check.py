@@ -0,0 +1,73 @@
+"""
+Checks the local sentiment lexicon on hand-written minutes.
+
+Neutral minutes full of banking acronyms (ATM, PIN, ACH, SSN, CVV...) must not
+be scored as Anger, while a run of shouted words still must. Short minutes with
+a single weak cue, common around hold time, must not be settled locally with a
+label other than Calm: they go to the LLM. Each line prints
+the local label, its share of the evidence and whether the minute would be
+settled locally or sent to the LLM.
+
+Run from the repository root:
+    python playground/sentiment_lexicon_check.py
+"""
+import importlib.util
+import os
+
+# Loaded by path so the check does not import the ADK agents of the package.
+LEXICON_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "sage", "manager_agent", "sub_agents",
+    "sentiment_agent", "lexicon.py",
+)
+spec = importlib.util.spec_from_file_location("lexicon", LEXICON_PATH)
+lexicon = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(lexicon)
+
+NEUTRAL = [
+    "I used the ATM to check my PIN and the ACH transfer went through. "
+    "Can you confirm the last four of my SSN and the CVV on the card?",
+    "My IRA and my CD both show the APR. Please send the PDF by SMS or email, OK?",
+    "The FDIC insured amount is on the website. Do you need my DOB and ZIP code for the ID check?",
+    "ATM PIN ACH SSN CVV",
+    "Yes, that's the VISA card ending in four four two one, and I set up the OTP by SMS.",
+]
+SHORT = [
+    "Is the payment still pending?",
+    "Okay, I am waiting.",
+    "Let me check that again for you.",
+    "Great, let me pull that up.",
+    "Sorry, one moment please.",
+    "Thanks, I'll hold.",
+]
+SHOUTED = [
+    "THIS IS RIDICULOUS. I WANT MY MONEY BACK NOW!",
+    "I have told you three times, I DO NOT HAVE THE CARD ANYMORE.",
+]
+
+
+def report(text):
+    label, share, confident = lexicon.score_text(text)
+    print(f"{label:<12} {share:.2f} {'local' if confident else 'LLM  '}  {text[:70]}")
+    return label, confident
+
+
+def main():
+    failures = []
+    for text in NEUTRAL:
+        label, _ = report(text)
+        if label == "Anger":
+            failures.append(f"neutral minute scored as Anger: {text}")
+    for text in SHORT:
+        label, confident = report(text)
+        if confident and label != "Calm":
+            failures.append(f"short minute settled locally as {label}: {text}")
+    for text in SHOUTED:
+        label, _ = report(text)
+        if label != "Anger":
+            failures.append(f"shouted minute scored as {label}: {text}")
+    assert not failures, "\n".join(failures)
+    print("OK: acronyms are not shouting, shouted runs count towards Anger, weak cues are escalated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Trains the local intent classifier used in front of the IntentAgent LLM.
+
+Labelled calls come from a JSONL file with one {"transcript": [...], "intent": "..."}
+object per line, and/or from the finished sessions in the app's session
+database. Only sessions whose intent_classifier state says the LLM answered
+are used. An intent the local classifier answered is its own prediction, and
+training on it would only reinforce its mistakes. Those sessions, and sessions
+that do not record the source, are skipped.
+
+Part of the data is held out to report accuracy, how many calls the classifier
+would answer at the confidence threshold, and how accurate those answers are.
+The final model is trained on all the data and saved where the intent agent
+loads it.
+
+Usage (from the repository root):
+    python playground/train_intent_classifier.py [--labels calls.jsonl] [--sessions] [--output intent_model.npz]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "sage"))
+
+from manager_agent.sub_agents.intent_agent.agent import INTENT_CATEGORIES
+from manager_agent.sub_agents.intent_agent.local_classifier import (
+    INTENT_MIN_CONFIDENCE,
+    INTENT_MODEL_PATH,
+    TfidfIntentModel,
+    transcript_text,
+)
+
+APP_NAME = "Bank Audio Transcript Analyst"
+USER_ID = "dedsec995"
+DB_URL = "sqlite:///./my_agent_data.db"
+
+
+def load_jsonl(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                call = json.loads(line)
+                yield call["transcript"], call["intent"]
+
+
+async def load_sessions():
+    from google.adk.sessions import DatabaseSessionService
+
+    service = DatabaseSessionService(db_url=DB_URL)
+    response = await service.list_sessions(app_name=APP_NAME, user_id=USER_ID)
+    calls = [
+        (session.state.get("transcript"), session.state.get("intent_state"))
+        for session in response.sessions
+        if (session.state.get("intent_classifier") or {}).get("source") == "llm"
+    ]
+    skipped = len(response.sessions) - len(calls)
+    print(f"{len(calls)} sessions labelled by the LLM, {skipped} skipped (local or unknown source)")
+    return calls
+
+
+def evaluate(model, examples, min_confidence):
+    correct = answered = answered_correct = 0
+    for text, label in examples:
+        intent, confidence = model.predict(text)
+        correct += intent == label
+        if intent is not None and confidence >= min_confidence:
+            answered += 1
+            answered_correct += intent == label
+    print(f"held-out calls:          {len(examples)}")
+    print(f"accuracy:                {correct / len(examples):.1%}")
+    print(f"answered locally:        {answered / len(examples):.1%} (confidence >= {min_confidence})")
+    if answered:
+        print(f"accuracy when answered:  {answered_correct / answered:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", help="JSONL file of labelled transcripts")
+    parser.add_argument("--sessions", action="store_true", help="also use the intents of finished sessions")
+    parser.add_argument("--output", default=INTENT_MODEL_PATH)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--min-confidence", type=float, default=INTENT_MIN_CONFIDENCE)
+    args = parser.parse_args()
+
+    calls = []
+    if args.labels:
+        calls.extend(load_jsonl(args.labels))
+    if args.sessions:
+        calls.extend(asyncio.run(load_sessions()))
+    examples = [
+        (transcript_text(transcript), intent)
+        for transcript, intent in calls
+        if transcript and intent in INTENT_CATEGORIES
+    ]
+    if len(examples) < 10:
+        sys.exit(f"Only {len(examples)} labelled calls found; pass --labels and/or --sessions.")
+    print(f"{len(examples)} labelled calls, {len({label for _, label in examples})} intents")
+
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    if 0 < split < len(examples):
+        texts, labels = zip(*examples[:split])
+        evaluate(TfidfIntentModel.fit(list(texts), list(labels)), examples[split:], args.min_confidence)
+
+    texts, labels = zip(*examples)
+    model = TfidfIntentModel.fit(list(texts), list(labels))
+    model.save(args.output)
+    print(f"Saved {len(model.vocabulary)}-term model for {len(model.labels)} intents to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
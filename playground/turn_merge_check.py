@@ -0,0 +1,63 @@
+"""
+Checks merge_turns on small hand-made diarization outputs.
+
+Each case lists raw turns as (start, end, label) and the turns expected after
+merging with the default gap, minimum duration and overlap policy.
+
+Run from the repository root:
+    python playground/turn_merge_check.py
+"""
+import importlib.util
+import os
+
+# Loaded by path so the check does not import the ADK agents of the package.
+TURNS_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "sage", "manager_agent", "sub_agents",
+    "audio_to_transcript_agent", "turns.py",
+)
+spec = importlib.util.spec_from_file_location("turns", TURNS_PATH)
+turns = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(turns)
+
+CASES = {
+    "backchannel sharing the start of a longer turn": (
+        [(0.0, 3.0, "B"), (0.0, 10.0, "A")],
+        [(0.0, 10.0, "A")],
+    ),
+    "longer turn listed first with the same start": (
+        [(0.0, 10.0, "A"), (0.0, 3.0, "B")],
+        [(0.0, 10.0, "A")],
+    ),
+    "backchannel inside a turn": (
+        [(0.0, 10.0, "A"), (4.0, 5.0, "B"), (10.5, 14.0, "B")],
+        [(0.0, 10.0, "A"), (10.5, 14.0, "B")],
+    ),
+    "partial overlap cut at its middle": (
+        [(0.0, 5.0, "A"), (4.0, 8.0, "B")],
+        [(0.0, 4.5, "A"), (4.5, 8.0, "B")],
+    ),
+    "same speaker across a short gap": (
+        [(0.0, 2.0, "A"), (2.05, 4.0, "A"), (5.0, 7.0, "B")],
+        [(0.0, 4.0, "A"), (5.0, 7.0, "B")],
+    ),
+    "fragment dropped and neighbours merged": (
+        [(0.0, 3.0, "A"), (3.0, 3.05, "B"), (3.05, 6.0, "A")],
+        [(0.0, 6.0, "A")],
+    ),
+}
+
+
+def main():
+    failures = 0
+    for name, (raw, expected) in CASES.items():
+        merged = turns.merge_turns([{"start": s, "end": e, "label": label} for s, e, label in raw])
+        got = [(round(turn["start"], 3), round(turn["end"], 3), turn["label"]) for turn in merged]
+        status = "OK  " if got == expected else "FAIL"
+        failures += got != expected
+        print(f"{status} {name}: {got}")
+    assert not failures, f"{failures} case(s) failed"
+    print("OK: all turn merge cases pass")
+
+
+if __name__ == "__main__":
+    main()
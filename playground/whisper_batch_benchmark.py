@@ -0,0 +1,52 @@
+"""
+Compares per-segment Whisper decoding against batched decoding.
+
+Diarization runs once; the same merged segments are then decoded with the
+old one-transcribe()-per-segment loop and with batched decoding, reporting
+wall-clock and process CPU time for each.
+
+Usage (from the repository root):
+    python playground/whisper_batch_benchmark.py path/to/call.wav [batch_size ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "sage"))
+
+from manager_agent.sub_agents.audio_to_transcript_agent.audio import load_audio
+from manager_agent.sub_agents.audio_to_transcript_agent.local_backend import diarize, transcribe_segments
+from manager_agent.sub_agents.audio_to_transcript_agent.models import registry
+
+
+def timed(label, fn):
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    result = fn()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    print(f"{label:<20} wall {wall:8.2f}s   cpu {cpu:8.2f}s   segments {len(result)}")
+    return result
+
+
+def main():
+    audio_path = sys.argv[1]
+    batch_sizes = [int(b) for b in sys.argv[2:]] or [8, 16, 32]
+
+    audio_waveform = load_audio(audio_path)
+    merged_segments = diarize(audio_waveform)
+    whisper_model = registry.get("whisper")
+    print(f"{len(merged_segments)} merged segments\n")
+
+    baseline = timed("loop", lambda: transcribe_segments(whisper_model, audio_waveform, merged_segments, batch_size=1))
+    for batch_size in batch_sizes:
+        batched = timed(
+            f"batched x{batch_size}",
+            lambda: transcribe_segments(whisper_model, audio_waveform, merged_segments, batch_size=batch_size),
+        )
+        same = sum(a[3] == b[3] for a, b in zip(baseline, batched))
+        print(f"{'':<20} identical text in {same}/{len(baseline)} segments")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures CPU Whisper decoding speedup against the number of worker processes.
+
+Diarization runs once; the same merged segments are then decoded in-process
+and with WhisperPool at each worker count. Pool start-up and model loading
+are excluded by warming every pool with one short clip before timing.
+
+Usage (from the repository root, on a CPU-only machine):
+    python playground/whisper_pool_benchmark.py path/to/call.wav [workers ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "sage"))
+
+from manager_agent.sub_agents.audio_to_transcript_agent.audio import TARGET_SAMPLE_RATE, load_audio
+from manager_agent.sub_agents.audio_to_transcript_agent.local_backend import WHISPER_BATCH_SIZE, diarize, transcribe_segments
+from manager_agent.sub_agents.audio_to_transcript_agent.models import registry
+from manager_agent.sub_agents.audio_to_transcript_agent.whisper_pool import WhisperPool
+
+
+def main():
+    audio_path = sys.argv[1]
+    cores = os.cpu_count() or 1
+    worker_counts = [int(w) for w in sys.argv[2:]] or sorted({2, 4, cores // 2, cores} - {0, 1})
+
+    audio_waveform = load_audio(audio_path)
+    merged_segments = diarize(audio_waveform)
+    print(f"{len(merged_segments)} merged segments, {cores} cores\n")
+
+    start = time.perf_counter()
+    baseline = transcribe_segments(registry.get("whisper"), audio_waveform, merged_segments)
+    baseline_seconds = time.perf_counter() - start
+    print(f"{'in-process':<12} {baseline_seconds:8.2f}s   speedup  1.00x")
+
+    warmup = [np.zeros(TARGET_SAMPLE_RATE, dtype=np.float32)]
+    for workers in worker_counts:
+        pool = WhisperPool(workers)
+        pool.decode(warmup * workers, WHISPER_BATCH_SIZE)
+
+        start = time.perf_counter()
+        texts = pool.decode(
+            [audio_waveform[int(s['start'] * TARGET_SAMPLE_RATE):int(s['end'] * TARGET_SAMPLE_RATE)] for s in merged_segments],
+            WHISPER_BATCH_SIZE,
+        )
+        seconds = time.perf_counter() - start
+        pool.shutdown()
+
+        same = sum(segment[3] in texts for segment in baseline)
+        print(
+            f"{f'{workers} workers':<12} {seconds:8.2f}s   speedup {baseline_seconds / seconds:5.2f}x"
+            f"   identical text in {same}/{len(baseline)} segments"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares Whisper precisions on CPU: word error rate against decoding speed.
+
+Every audio file in the sample directory needs a reference transcript next to
+it with the same name and a .txt extension. Each precision transcribes the
+whole set with the same model; the report shows total decode time, real-time
+factor (decode seconds per audio second), word error rate and the size of the
+model weights.
+
+Usage (from the repository root):
+    python playground/whisper_precision_report.py path/to/samples [float32 int8 ...]
+"""
+import io
+import os
+import re
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "sage"))
+
+from manager_agent.sub_agents.audio_to_transcript_agent.audio import TARGET_SAMPLE_RATE, load_audio
+from manager_agent.sub_agents.audio_to_transcript_agent.models import load_whisper_model
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".ogg", ".flac")
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Returns the word-level edit distance between two word lists."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def weights_megabytes(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1e6
+
+
+def load_samples(sample_dir):
+    samples = []
+    for name in sorted(os.listdir(sample_dir)):
+        stem, extension = os.path.splitext(name)
+        reference_path = os.path.join(sample_dir, stem + ".txt")
+        if extension.lower() in AUDIO_EXTENSIONS and os.path.exists(reference_path):
+            with open(reference_path) as f:
+                samples.append((name, load_audio(os.path.join(sample_dir, name)), normalize(f.read())))
+    return samples
+
+
+def main():
+    sample_dir = sys.argv[1]
+    precisions = sys.argv[2:] or ["float32", "int8"]
+    samples = load_samples(sample_dir)
+    audio_seconds = sum(len(audio) for _, audio, _ in samples) / TARGET_SAMPLE_RATE
+    reference_words = sum(len(reference) for _, _, reference in samples)
+    print(f"{len(samples)} samples, {audio_seconds:.0f}s of audio, {reference_words} reference words\n")
+    print(f"{'precision':<10} {'decode':>9} {'RTF':>7} {'WER':>7} {'weights':>9}")
+
+    for precision in precisions:
+        model = load_whisper_model(precision)
+        model.transcribe(samples[0][1][:TARGET_SAMPLE_RATE], fp16=False)
+
+        errors = 0
+        start = time.perf_counter()
+        for _, audio, reference in samples:
+            hypothesis = normalize(model.transcribe(audio, fp16=False)["text"])
+            errors += word_errors(reference, hypothesis)
+        seconds = time.perf_counter() - start
+
+        print(
+            f"{precision:<10} {seconds:8.1f}s {seconds / audio_seconds:7.3f} "
+            f"{errors / max(1, reference_words):7.2%} {weights_megabytes(model):7.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@ import asyncio
 import os
 import uuid
 from datetime import datetime
-from manager_agent.agent import manager_agent
+from manager_agent.agent import ANALYSIS_MODE, root_agent
+from manager_agent.sub_agents.audio_to_transcript_agent.ingest import SUPPORTED_FORMATS, probe_audio
 from dotenv import load_dotenv
 from google.adk.runners import Runner
 from google.adk.sessions import DatabaseSessionService
@@ -145,8 +146,12 @@ async def call_agent_async_ui(runner, session_id, query, chat_placeholder, statu
                     status_text = "原因 Analyzing root cause..."
                 elif event.author == "synthesizer_agent":
                     status_text = "Generating final report..."
+                elif event.author == "sage_pipeline":
+                    status_text = "Running analysis pipeline..."
                 elif event.author == "manager_agent":
                     status_text = "Orchestrating analysis..."
+                elif event.author == "sage_chat":
+                    status_text = "Thinking..."
                 status_placeholder.text(status_text)
 
             if event.author:
@@ -276,8 +281,8 @@ def home_page():
     with st.container(border=True):
         st.subheader("Start New Analysis")
         uploaded_file = st.file_uploader(
-            "Choose an audio file (.wav only)",
-            type=["wav"]
+            "Choose an audio file (.wav, .mp3, .ogg or .flac)",
+            type=list(SUPPORTED_FORMATS)
         )
         if uploaded_file is not None:
             if not os.path.exists(UPLOAD_DIR):
@@ -285,11 +290,27 @@ def home_page():
             file_path = os.path.join(UPLOAD_DIR, uploaded_file.name)
             with open(file_path, "wb") as f:
                 f.write(uploaded_file.getbuffer())
-            st.success(f"File '{uploaded_file.name}' uploaded successfully!")
-            if st.button("Analyze File"):
+            try:
+                probe_audio(file_path)
+                upload_valid = True
+            except ValueError as e:
+                upload_valid = False
+                st.error(f"File '{uploaded_file.name}' cannot be analyzed: {e}")
+            if upload_valid:
+                st.success(f"File '{uploaded_file.name}' uploaded successfully!")
+                mode = st.radio(
+                    "Analysis mode",
+                    ["full", "fast"],
+                    index=1 if ANALYSIS_MODE == "fast" else 0,
+                    format_func=lambda m: "Full (separate intent, sentiment and root cause)" if m == "full"
+                    else "Fast (single call, coarse sentiment)",
+                    horizontal=True,
+                )
+            if upload_valid and st.button("Analyze File"):
                 st.session_state.clear()
                 st.session_state.page = "analysis"
                 st.session_state.audio_path = file_path
+                st.session_state.analysis_mode = mode
                 st.session_state.session_id = str(uuid.uuid4())
                 st.rerun()
 
@@ -309,7 +330,7 @@ def analysis_page():
     # Initialize session service and runner
     session_service = DatabaseSessionService(db_url=DB_URL)
     runner = Runner(
-        agent=manager_agent,
+        agent=root_agent,
         app_name=APP_NAME,
         session_service=session_service,
     )
@@ -325,6 +346,7 @@ def analysis_page():
         async def run_analysis():
             session_state = initial_state.copy()
             session_state["audio_filepath"] = audio_path
+            session_state["analysis_mode"] = st.session_state.get("analysis_mode", ANALYSIS_MODE)
             await session_service.create_session(
                 app_name=APP_NAME,
                 user_id=USER_ID,
@@ -1,7 +1,7 @@
 import asyncio
 
-# Import the main manager agent
-from manager_agent.agent import manager_agent
+# Import the root agent
+from manager_agent.agent import root_agent
 from dotenv import load_dotenv
 from google.adk.runners import Runner
 from google.adk.sessions import DatabaseSessionService
@@ -60,7 +60,7 @@ async def main_async():
     # ===== PART 4: Agent Runner Setup =====
     # Create a runner with the main manager agent
     runner = Runner(
-        agent=manager_agent,
+        agent=root_agent,
         app_name=APP_NAME,
         session_service=session_service,
     )
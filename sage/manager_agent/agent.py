@@ -1,15 +1,33 @@
-from google.adk.agents import Agent, SequentialAgent, ParallelAgent
+import asyncio
+import os
+from typing import AsyncGenerator
+from google.adk.agents import Agent, BaseAgent, SequentialAgent, ParallelAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 from google.adk.tools.tool_context import ToolContext
 from google.adk.models.lite_llm import LiteLlm
-from .sub_agents.intent_agent.agent import intent_agent
-from .sub_agents.sentiment_agent.agent import sentiment_agent
-from .sub_agents.root_cause_agent.agent import root_cause_agent
-from .sub_agents.audio_to_transcript_agent.agent import audio_to_transcript_agent
-from .sub_agents.synthesizer_agent.agent import synthesizer_agent
+from google.genai import types
+from .sub_agents.intent_agent.agent import intent_agent, classify_intent
+from .sub_agents.intent_agent.local_classifier import intent_classifier
+from .sub_agents.sentiment_agent.agent import sentiment_agent, score_sentiment, StreamingSentimentScorer
+from .sub_agents.root_cause_agent.agent import root_cause_agent, find_root_cause
+from .sub_agents.audio_to_transcript_agent.agent import audio_to_transcript_agent, transcribe_file, stream_transcript
+from .sub_agents.synthesizer_agent.agent import synthesizer_agent, build_summary_report
+from .sub_agents.fast_analysis_agent.agent import fast_analysis_agent, analyze_call
+from .sub_agents.prompt_context import usage_report
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# "deterministic" runs the analysis as plain code, "agentic" lets the manager LLM drive sage_workflow.
+PIPELINE_MODE = os.getenv("SAGE_PIPELINE_MODE", "deterministic")
+# Stream the transcript chunk by chunk and score sentiment minutes as they close.
+STREAM_TRANSCRIPT = os.getenv("SAGE_STREAM_TRANSCRIPT", "false").lower() == "true"
+# "full" runs the intent, sentiment and root cause analyses separately, "fast" does all three in
+# one structured call with a coarser sentiment timeline. A run can override it with the
+# `analysis_mode` state key.
+ANALYSIS_MODE = os.getenv("SAGE_ANALYSIS_MODE", "full")
+
 def set_filepath(tool_context: ToolContext, filepath: str) -> dict:
     """
     Sets the audio filepath in the state.
@@ -24,18 +42,47 @@ def set_filepath(tool_context: ToolContext, filepath: str) -> dict:
     tool_context.state["audio_filepath"] = filepath
     return {"status": f"Filepath set to {filepath}"}
 
+def analysis_mode(state) -> str:
+    """Returns the analysis mode of the run: the `analysis_mode` state key, else SAGE_ANALYSIS_MODE."""
+    return state.get("analysis_mode") or ANALYSIS_MODE
+
+class AnalysisModeAgent(BaseAgent):
+    """
+    Runs either the full analysis agents or the single-call fast analysis.
+
+    Both fill intent_state, sentiment_state and root_cause_state, so the
+    synthesizer that follows does not depend on the mode.
+    """
+
+    full: BaseAgent
+    fast: BaseAgent
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, full: BaseAgent, fast: BaseAgent):
+        super().__init__(name=name, full=full, fast=fast, sub_agents=[full, fast])
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        agent = self.fast if analysis_mode(ctx.session.state) == "fast" else self.full
+        async for event in agent.run_async(ctx):
+            yield event
+
 # Define the main workflow as a SequentialAgent
 sage_workflow = SequentialAgent(
     name="sage_workflow",
     sub_agents=[
         audio_to_transcript_agent,
-        ParallelAgent(
-            name="analysis_agents",
-            sub_agents=[
-                intent_agent,
-                sentiment_agent,
-                root_cause_agent,
-            ]
+        AnalysisModeAgent(
+            name="analysis",
+            full=ParallelAgent(
+                name="analysis_agents",
+                sub_agents=[
+                    intent_agent,
+                    sentiment_agent,
+                    root_cause_agent,
+                ]
+            ),
+            fast=fast_analysis_agent,
         ),
         synthesizer_agent,
     ]
@@ -50,8 +97,164 @@ manager_agent = Agent(
     Your primary role is to manage a team of specialized agents to provide a comprehensive analysis of customer service calls.
     The state `audio_filepath` : {audio_filepath}
     If the `audio_filepath` is set in the state and the analysis has not been done yet, call the `sage_workflow` agent to perform the analysis.
-    Otherwise, you can chat with the user and answer their questions.
+    Otherwise, you can chat with the user and answer their questions based on {intent_state}, {sentiment_state}, {root_cause_state} and {analysis_report}.
     """,
     sub_agents=[sage_workflow],
     tools=[set_filepath],
 )
+
+# The chat side of SageAgent: it records the audio file but never runs the analysis itself.
+chat_agent = Agent(
+    name="sage_chat",
+    model=LiteLlm(model="openai/gpt-4o"),
+    description="Chats with the user about the call analysis and records the audio file to analyze.",
+    instruction="""
+    You are Sage, a friendly and intelligent AI assistant for analyzing bank audio transcripts.
+    The state `audio_filepath` : {audio_filepath}
+    If the user gives the path of an audio file to analyze, call the `set_filepath` tool with it; the analysis then runs on its own.
+    Otherwise, you can chat with the user and answer their questions based on {intent_state}, {sentiment_state}, {root_cause_state} and {analysis_report}.
+    """,
+    tools=[set_filepath],
+)
+
+
+class SagePipelineAgent(BaseAgent):
+    """
+    Runs transcribe -> analyze -> synthesize as plain code.
+
+    Each stage calls the sub-agents' analysis functions directly instead of
+    asking an LLM to call the matching tool, and writes its results to the
+    state through event state deltas. With SAGE_STREAM_TRANSCRIPT enabled each
+    finished minute is sent for sentiment scoring while later chunks are still
+    transcribing; every chunk only advances `transcribed_until` in the state
+    and the transcript is written once, when transcription ends. In
+    fast analysis mode the three analyses are a single call after transcription.
+    """
+
+    def _state_event(self, ctx: InvocationContext, state_delta: dict, text: str = None) -> Event:
+        content = None
+        if text is not None:
+            content = types.Content(role="model", parts=[types.Part(text=text)])
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=content,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        audio_filepath = ctx.session.state.get("audio_filepath")
+        fast = analysis_mode(ctx.session.state) == "fast"
+
+        usage = {}
+        intent_report = {}
+        scorer = StreamingSentimentScorer(usage=usage) if STREAM_TRANSCRIPT and not fast else None
+        transcription = {}
+        try:
+            if scorer:
+                transcript = []
+                async for segments in stream_transcript(audio_filepath, report=transcription):
+                    transcript.extend(segments)
+                    scorer.add(segments)
+                    if segments:
+                        yield self._state_event(ctx, {"transcribed_until": segments[-1][1]})
+            else:
+                transcript = await transcribe_file(audio_filepath, transcription)
+        except FileNotFoundError:
+            if scorer:
+                scorer.cancel()
+            yield self._state_event(ctx, {}, f"Audio file not found at path: {audio_filepath}")
+            return
+        except Exception as e:
+            if scorer:
+                scorer.cancel()
+            yield self._state_event(ctx, {}, f"An error occurred during transcription: {e}")
+            return
+        transcribed = {"is_audio_transcribed": True, "transcript": transcript}
+        if "vad" in transcription:
+            transcribed["vad_report"] = transcription["vad"]
+        if not transcript:
+            # Nothing to analyze. Setting the report ends the pipeline for this
+            # session, so later turns go to the chat instead of transcribing again.
+            if scorer:
+                scorer.cancel()
+            message = f"Transcript not found: no speech was detected in {audio_filepath}."
+            yield self._state_event(ctx, {**transcribed, "analysis_report": message}, message)
+            return
+        yield self._state_event(ctx, transcribed)
+
+        try:
+            if fast:
+                intent, root_cause, sentiment = await analyze_call(transcript, usage)
+            else:
+                intent, sentiment, root_cause = await asyncio.gather(
+                    classify_intent(transcript, usage, intent_report),
+                    scorer.finish() if scorer else score_sentiment(transcript, usage=usage),
+                    find_root_cause(transcript, usage),
+                )
+        except Exception as e:
+            yield self._state_event(ctx, {}, f"An error occurred during analysis: {e}")
+            return
+        analysis = {
+            "intent_state": intent,
+            "sentiment_state": sentiment,
+            "root_cause_state": root_cause,
+        }
+        if intent_report:
+            analysis["intent_classifier"] = {**intent_report, **intent_classifier.stats()}
+        yield self._state_event(ctx, analysis)
+
+        try:
+            report = await build_summary_report(intent, root_cause, sentiment, transcript, usage)
+        except Exception as e:
+            yield self._state_event(ctx, {}, f"An error occurred while generating the report: {e}")
+            return
+        yield self._state_event(ctx, {"analysis_report": report, "prompt_tokens": usage_report(usage)}, report)
+
+
+class SageAgent(BaseAgent):
+    """
+    Root agent that keeps the LLM out of the analysis path.
+
+    When an audio file is set and no report exists yet, the turn is handled by
+    the deterministic pipeline; every other turn goes to the chat agent. If
+    the chat turn sets the audio file, the pipeline runs right after it in
+    the same turn.
+    """
+
+    pipeline: BaseAgent
+    chat: BaseAgent
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, pipeline: BaseAgent, chat: BaseAgent):
+        super().__init__(
+            name=name,
+            pipeline=pipeline,
+            chat=chat,
+            sub_agents=[pipeline, chat],
+        )
+
+    @staticmethod
+    def _needs_analysis(state) -> bool:
+        return bool(state.get("audio_filepath")) and not state.get("analysis_report")
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if not self._needs_analysis(ctx.session.state):
+            async for event in self.chat.run_async(ctx):
+                yield event
+        if self._needs_analysis(ctx.session.state):
+            async for event in self.pipeline.run_async(ctx):
+                yield event
+
+
+sage_pipeline = SagePipelineAgent(
+    name="sage_pipeline",
+    description="Runs the transcription and analysis pipeline without LLM routing.",
+)
+
+if PIPELINE_MODE == "agentic":
+    root_agent = manager_agent
+else:
+    root_agent = SageAgent(name="sage", pipeline=sage_pipeline, chat=chat_agent)
@@ -1,21 +1,70 @@
 from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools.tool_context import ToolContext
-from openai import OpenAI
 from dotenv import load_dotenv
+import asyncio
 import os
-import torch
-import whisper
-import torchaudio
-from pyannote.audio import Pipeline
-from pyannote.core import Segment
+from .backends import TRANSCRIPT_CACHE_ENABLED, select_backend
+from .cache import get_transcript_cache
+from .ingest import probe_audio
+from .model_server import MODEL_SERVER_SOCKET
+from .models import registry
+from .openai_backend import CHUNK_SECONDS
 
 load_dotenv()
 
-HF_TOKEN = os.getenv('HF_TOKEN')
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+async def transcribe_file(audio_filepath: str, report: dict = None) -> list:
+    """
+    Transcribes an audio file with the backend chosen for it.
+
+    The file is validated, routed to a registered backend (see
+    backends.select_backend) and transcribed through the VAD and cache
+    stages when they are enabled.
+
+    Args:
+        audio_filepath (str): The path to the audio file.
+        report (dict): If given, receives the chosen 'backend', the 'cache'
+            outcome and the VAD skip report under 'vad'.
+
+    Returns:
+        list: A list of [start_time, end_time, speaker_id, text] segments.
+    """
+    if not os.path.exists(audio_filepath):
+        raise FileNotFoundError(audio_filepath)
+    await asyncio.to_thread(probe_audio, audio_filepath)
+
+    backend = await select_backend(audio_filepath)
+    if report is not None:
+        report["backend"] = await backend.id()
+    return await backend.transcribe(audio_filepath, report)
 
-def transcribe_audio(tool_context: ToolContext) -> dict:
+async def stream_transcript(audio_filepath: str, chunk_seconds: float = CHUNK_SECONDS, report: dict = None):
+    """
+    Transcribes an audio file with the backend chosen for it, one chunk at a time.
+
+    Backends that cannot stream, such as the stereo path or a cache hit,
+    yield the whole transcript as a single chunk.
+
+    Args:
+        audio_filepath (str): The path to the audio file.
+        chunk_seconds (float): Length of each chunk in seconds.
+        report (dict): If given, receives the same details as transcribe_file().
+
+    Yields:
+        list: The [start_time, end_time, speaker_id, text] segments of each
+            chunk, in timeline order.
+    """
+    if not os.path.exists(audio_filepath):
+        raise FileNotFoundError(audio_filepath)
+    await asyncio.to_thread(probe_audio, audio_filepath)
+
+    backend = await select_backend(audio_filepath)
+    if report is not None:
+        report["backend"] = await backend.id()
+    async for segments in backend.stream(audio_filepath, chunk_seconds, report):
+        yield segments
+
+async def transcribe_audio(tool_context: ToolContext) -> dict:
     """
     Transcribes an audio file and performs speaker diarization.
 
@@ -31,116 +80,26 @@ def transcribe_audio(tool_context: ToolContext) -> dict:
         raise Exception("error: Audio filepath not found in state. Stopping workflow.")
         return {"error": "Audio filepath not found in state."}
 
-    if not OPENAI_API_KEY:
-        return {"error": "OPENAI_API_KEY not found in environment."}
-
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        with open(audio_filepath, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="gpt-4o-transcribe-diarize",
-                file=audio_file,
-                response_format="diarized_json",
-                chunking_strategy="auto",
-            )
-        modified_output = [
-            [segment.start, segment.end, segment.speaker, segment.text.strip()]
-            for segment in transcript.segments
-        ]
+        report = {}
+        modified_output = await transcribe_file(audio_filepath, report)
         tool_context.state["is_audio_transcribed"] = True
         tool_context.state['transcript'] = modified_output
-        return {'transcript': modified_output}
+        result = {'transcript': modified_output, 'backend': report['backend']}
+        if 'vad' in report:
+            tool_context.state['vad_report'] = report['vad']
+            result['vad'] = report['vad']
+        if TRANSCRIPT_CACHE_ENABLED:
+            result['transcript_cache'] = get_transcript_cache().stats()
+        if report['backend'].startswith("local") and not MODEL_SERVER_SOCKET:
+            result['model_timings'] = registry.stats()
+        return result
     except FileNotFoundError:
         return {"error": f"Audio file not found at path: {audio_filepath}"}
     except Exception as e:
         return {"error": f"An error occurred during transcription: {e}"}
 
 
-# def transcribe_audio(tool_context):    
-#     """
-#     Transcribes an audio file and performs speaker diarization.
-
-#     Args:
-#         tool_context (ToolContext): The tool context containing the audio filepath.
-
-#     Returns:
-#         dict: A dictionary containing the 'transcript' key with a list of 
-#               [start_time, end_time, speaker_id, text] segments.
-#     """
-
-#     audio_path = tool_context.state.get("audio_filepath")
-#     if not audio_path:
-#         raise Exception("error: Audio filepath not found in state. Stopping workflow.")
-#     print(f"The file path: {audio_path}")
-#     device = "cuda" if torch.cuda.is_available() else "cpu"
-#     try:
-#         pipeline = Pipeline.from_pretrained(
-#             "pyannote/speaker-diarization-3.1",
-#             use_auth_token=HF_TOKEN
-#         )
-#         pipeline.to(torch.device(device))
-#     except Exception as e:
-#         return {'error': "Failed to set up the pipeline"} 
-    
-#     diarization = pipeline(audio_path, num_speakers=2)
-#     whisper_model = whisper.load_model("base", device=device)
-    
-#     try:
-#         audio_waveform = whisper.load_audio(audio_path)
-#         sample_rate = whisper.audio.SAMPLE_RATE
-#     except Exception as e:
-#         return {'error': "Failed to transform in whisper compatiable form"} 
-
-    
-#     all_segments = []
-#     for segment, track_id, label in diarization.itertracks(yield_label=True):
-#         all_segments.append({
-#             'start': segment.start,
-#             'end': segment.end,
-#             'label': label
-#         })
-    
-#     if not all_segments:
-#         return {'error': "Not all segments present"} 
-        
-#     all_segments.sort(key=lambda x: x['start'])
-    
-#     merged_segments = []
-#     current_segment = all_segments[0].copy()
-
-#     for next_seg in all_segments[1:]:
-#         if (next_seg['label'] == current_segment['label'] and 
-#             next_seg['start'] - current_segment['end'] < 0.1):
-#             current_segment['end'] = next_seg['end']
-#         else:
-#             merged_segments.append(current_segment)
-#             current_segment = next_seg.copy()
-    
-#     merged_segments.append(current_segment)
-
-#     final_output_list = []
-#     for i, segment in enumerate(merged_segments):
-#         start_time = segment['start']
-#         end_time = segment['end']
-#         label = segment['label']
-        
-#         start_sample = int(start_time * sample_rate)
-#         end_sample = int(end_time * sample_rate)
-        
-#         segment_audio = audio_waveform[start_sample:min(end_sample, len(audio_waveform))]
-
-#         result = whisper_model.transcribe(segment_audio, fp16=torch.cuda.is_available())
-#         text = result['text'].strip()
-
-#         if text:
-#             final_output_list.append([start_time, end_time, label, text])
-
-#     tool_context.state["is_audio_transcribed"] = True
-#     tool_context.state['transcript'] = final_output_list
-    
-#     return {'transcript': final_output_list}
-
-
 audio_to_transcript_agent = Agent(
     name="audio_to_transcript_agent",
     model="gemma-3-27b-it",
@@ -0,0 +1,272 @@
+import io
+import os
+import struct
+import wave
+import numpy as np
+
+# Sample rate every model in the local path expects.
+TARGET_SAMPLE_RATE = 16000
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_DTYPES = {
+    (_WAVE_FORMAT_PCM, 1): np.dtype(np.uint8),
+    (_WAVE_FORMAT_PCM, 2): np.dtype("<i2"),
+    (_WAVE_FORMAT_PCM, 4): np.dtype("<i4"),
+    (_WAVE_FORMAT_IEEE_FLOAT, 4): np.dtype("<f4"),
+    (_WAVE_FORMAT_IEEE_FLOAT, 8): np.dtype("<f8"),
+}
+_RESAMPLE_BLOCK = 1 << 20
+_ANTI_ALIAS_TAPS = 63
+
+
+def wav_layout(audio_path: str) -> dict:
+    """
+    Parses the RIFF header of a WAV file without reading its samples.
+
+    Args:
+        audio_path (str): The path to the WAV file.
+
+    Returns:
+        dict: 'format', 'channels', 'sample_rate', 'sample_width',
+            'data_offset' (bytes) and 'frames'.
+
+    Raises:
+        wave.Error: If the file is not a WAV file this module can map.
+    """
+    file_size = os.path.getsize(audio_path)
+    with open(audio_path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise wave.Error("Not a RIFF/WAVE file")
+
+        layout = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise wave.Error("WAV file has no data chunk")
+            chunk_id, size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                fmt, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+                if fmt == _WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    fmt = struct.unpack("<H", body[24:26])[0]
+                layout = {
+                    "format": fmt,
+                    "channels": channels,
+                    "sample_rate": sample_rate,
+                    "sample_width": bits // 8,
+                    "block_align": block_align,
+                }
+                f.seek(size % 2, 1)
+            elif chunk_id == b"data":
+                if layout is None:
+                    raise wave.Error("WAV data chunk before fmt chunk")
+                data_offset = f.tell()
+                data_size = min(size, file_size - data_offset)
+                layout["data_offset"] = data_offset
+                layout["frames"] = data_size // layout["block_align"]
+                return layout
+            else:
+                f.seek(size + size % 2, 1)
+
+
+def memmap_wav(audio_path: str) -> tuple:
+    """
+    Memory-maps the samples of a WAV file without decoding them.
+
+    Args:
+        audio_path (str): The path to the WAV file.
+
+    Returns:
+        tuple: (raw samples of shape (frames, channels), sample_rate).
+    """
+    layout = wav_layout(audio_path)
+    dtype = _DTYPES.get((layout["format"], layout["sample_width"]))
+    if dtype is None:
+        raise wave.Error(
+            f"Unsupported WAV encoding: format {layout['format']}, {layout['sample_width']} bytes per sample"
+        )
+    samples = np.memmap(
+        audio_path,
+        dtype=dtype,
+        mode="r",
+        offset=layout["data_offset"],
+        shape=(layout["frames"], layout["channels"]),
+    )
+    return samples, layout["sample_rate"]
+
+
+def _pcm_offset_and_scale(dtype: np.dtype) -> tuple:
+    if dtype.kind == "f":
+        return 0.0, 1.0
+    if dtype == np.uint8:
+        return 128.0, 128.0
+    return 0.0, float(-np.iinfo(dtype).min)
+
+
+def to_float32(samples: np.ndarray) -> np.ndarray:
+    """Converts raw WAV samples to float32 in [-1, 1]."""
+    offset, scale = _pcm_offset_and_scale(samples.dtype)
+    converted = samples.astype(np.float32)
+    if offset:
+        converted -= offset
+    if scale != 1.0:
+        converted /= scale
+    return converted
+
+
+def to_mono_float32(samples: np.ndarray) -> np.ndarray:
+    """Downmixes raw (frames, channels) WAV samples to one float32 channel in [-1, 1]."""
+    if samples.shape[1] == 1:
+        return to_float32(samples[:, 0])
+    offset, scale = _pcm_offset_and_scale(samples.dtype)
+    mono = samples.mean(axis=1, dtype=np.float32)
+    if offset:
+        mono -= offset
+    if scale != 1.0:
+        mono /= scale
+    return mono
+
+
+def read_wav(audio_path: str, max_seconds: float = None) -> tuple:
+    """
+    Reads a WAV file as float32 samples in [-1, 1].
+
+    Args:
+        audio_path (str): The path to the WAV file.
+        max_seconds (float): Read only this many seconds from the start.
+
+    Returns:
+        tuple: (samples of shape (frames, channels), sample_rate).
+    """
+    samples, sample_rate = memmap_wav(audio_path)
+    if max_seconds is not None:
+        samples = samples[:int(max_seconds * sample_rate)]
+    return to_float32(samples), sample_rate
+
+
+def wav_channels(audio_path: str) -> int:
+    """Returns the channel count of a WAV file, or 0 if it is not a readable WAV."""
+    try:
+        return wav_layout(audio_path)["channels"]
+    except (wave.Error, OSError, struct.error):
+        return 0
+
+
+def is_dual_channel(audio_path: str, min_difference: float = 0.05, probe_seconds: float = 120) -> bool:
+    """
+    Tells whether a WAV file carries two different speakers on its two channels.
+
+    Stereo files that are just duplicated mono are common, so the channels
+    must also differ: over the first `probe_seconds`, the mean absolute
+    difference between them has to be at least `min_difference` of their
+    mean absolute level.
+
+    Args:
+        audio_path (str): The path to the audio file.
+        min_difference (float): Minimum relative difference between channels.
+        probe_seconds (float): How much audio to compare.
+
+    Returns:
+        bool: True for a genuine two-channel recording.
+    """
+    if wav_channels(audio_path) != 2:
+        return False
+    try:
+        samples, _ = read_wav(audio_path, max_seconds=probe_seconds)
+    except wave.Error:
+        return False
+    level = np.abs(samples).mean()
+    if level == 0:
+        return False
+    return np.abs(samples[:, 0] - samples[:, 1]).mean() / level >= min_difference
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resamples a mono float32 signal.
+
+    Downsampling applies a windowed-sinc low-pass filter so content above the
+    new Nyquist frequency does not alias, and the signal is linearly
+    interpolated. Both steps run block by block: each output block filters
+    only the input it reads, plus half the filter length on either side, so
+    peak memory stays bounded on long files.
+    """
+    if source_rate == target_rate:
+        return samples
+    kernel = None
+    if target_rate < source_rate:
+        taps = np.arange(_ANTI_ALIAS_TAPS) - (_ANTI_ALIAS_TAPS - 1) / 2
+        kernel = np.sinc(taps * target_rate / source_rate) * np.hamming(_ANTI_ALIAS_TAPS)
+        kernel = (kernel / kernel.sum()).astype(np.float32)
+    half = _ANTI_ALIAS_TAPS // 2
+
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    output = np.empty(target_length, dtype=np.float32)
+    last = len(samples) - 1
+    step = source_rate / target_rate
+    for start in range(0, target_length, _RESAMPLE_BLOCK):
+        positions = np.arange(start, min(start + _RESAMPLE_BLOCK, target_length)) * step
+        left = np.minimum(positions.astype(np.int64), last)
+        right = np.minimum(left + 1, last)
+        weight = (positions - left).astype(np.float32)
+        source = samples
+        if kernel is not None:
+            # Filtered samples [low, high), from the input with `half` samples of context; zero outside the signal.
+            low, high = int(left[0]), int(right[-1]) + 1
+            padded = np.zeros(high - low + 2 * half, dtype=np.float32)
+            read_low, read_high = max(low - half, 0), min(high + half, len(samples))
+            padded[read_low - low + half:read_high - low + half] = samples[read_low:read_high]
+            source = np.convolve(padded, kernel, mode="valid")
+            left, right = left - low, right - low
+        output[start:start + len(positions)] = source[left] * (1 - weight) + source[right] * weight
+    return output
+
+
+def load_audio(audio_path: str) -> np.ndarray:
+    """
+    Loads an audio file as 16 kHz mono float32, the format every local model uses.
+
+    WAV files are memory-mapped and converted with NumPy in a single pass, so
+    no ffmpeg process is spawned. The result is meant to be decoded once and
+    shared: diarization gets it as a tensor over the same memory and Whisper
+    receives slices of it as views. Other formats fall back to Whisper's
+    ffmpeg decoder.
+
+    Args:
+        audio_path (str): The path to the audio file.
+
+    Returns:
+        np.ndarray: The waveform at TARGET_SAMPLE_RATE.
+    """
+    try:
+        samples, sample_rate = memmap_wav(audio_path)
+    except (wave.Error, struct.error):
+        import whisper
+        return whisper.load_audio(audio_path)
+
+    mono = to_mono_float32(samples)
+    return np.ascontiguousarray(resample(mono, sample_rate, TARGET_SAMPLE_RATE))
+
+
+def load_channels(audio_path: str) -> np.ndarray:
+    """Loads the channels of a WAV file as 16 kHz float32 rows of shape (channels, samples)."""
+    samples, sample_rate = memmap_wav(audio_path)
+    return np.stack([
+        resample(to_float32(samples[:, channel]), sample_rate, TARGET_SAMPLE_RATE)
+        for channel in range(samples.shape[1])
+    ])
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encodes a mono float32 signal as a 16-bit PCM WAV file."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(pcm.tobytes())
+    return buffer.getvalue()
@@ -0,0 +1,319 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from .audio import is_dual_channel
+from .cache import TranscriptCache, get_transcript_cache
+from .ingest import probe_audio
+from .local_backend import diarization_engine_id, stream_with_diarization, transcribe_with_diarization
+from .model_server import MODEL_SERVER_SOCKET, server_engines, server_status, stream_from_server, transcribe_on_server, transcribe_stereo_on_server
+from .models import whisper_model_id
+from .openai_backend import (
+    CHUNK_MARGIN,
+    CHUNK_SECONDS,
+    OPENAI_API_KEY,
+    TRANSCRIBE_CONCURRENCY,
+    stream_openai,
+    transcribe_openai,
+)
+from .stereo import transcribe_stereo_local, transcribe_stereo_openai
+from .vad import map_transcript, trim_silence
+
+load_dotenv()
+
+# "openai" uses gpt-4o-transcribe-diarize, "local" runs pyannote and Whisper offline,
+# "auto" picks one per call from its duration, channels and the local queue depth.
+TRANSCRIBE_BACKEND = os.getenv("SAGE_TRANSCRIBE_BACKEND", "openai")
+TRANSCRIPT_CACHE_ENABLED = os.getenv("SAGE_TRANSCRIPT_CACHE", "true").lower() == "true"
+# "auto" transcribes genuine two-channel WAVs per channel without diarization, "off" always diarizes.
+STEREO_SPLIT = os.getenv("SAGE_STEREO_SPLIT", "auto")
+# Speaker labels of the left and right channel.
+STEREO_SPEAKERS = [label.strip() for label in os.getenv("SAGE_STEREO_SPEAKERS", "Agent,Customer").split(",")]
+# Transcribe only the speech regions of WAV files, skipping dead air and hold music. Opt-in:
+# the energy-based detector is a heuristic and a segment spanning a cut gets stretched timestamps.
+VAD_ENABLED = os.getenv("SAGE_VAD", "false").lower() == "true"
+# Files are only trimmed when at least this much audio would be skipped.
+VAD_MIN_SKIP_SECONDS = float(os.getenv("SAGE_VAD_MIN_SKIP_SECONDS", "10"))
+# Auto routing: calls up to this long take the lowest-latency backend (OpenAI), longer ones
+# the cheapest (local) while fewer than SAGE_ROUTE_MAX_LOCAL_QUEUE jobs are waiting there.
+ROUTE_SHORT_SECONDS = float(os.getenv("SAGE_ROUTE_SHORT_SECONDS", "300"))
+ROUTE_MAX_LOCAL_QUEUE = int(os.getenv("SAGE_ROUTE_MAX_LOCAL_QUEUE", "2"))
+
+
+class TranscriptionBackend:
+    """
+    Interface of a transcription backend.
+
+    A backend turns an audio file into [start_time, end_time, speaker_id, text]
+    segments. Subclasses implement transcribe(); stream() defaults to yielding
+    the whole transcript as a single chunk. The optional `report` dict
+    collects per-call details, such as the VAD skip report.
+    """
+
+    name = None
+
+    async def id(self) -> str:
+        """Names the backend and its models, for cache keys."""
+        return self.name
+
+    async def transcribe(self, audio_filepath: str, report: dict = None) -> list:
+        raise NotImplementedError
+
+    async def stream(self, audio_filepath: str, chunk_seconds: float = CHUNK_SECONDS, report: dict = None):
+        yield await self.transcribe(audio_filepath, report)
+
+
+class OpenAIBackend(TranscriptionBackend):
+    """gpt-4o-transcribe-diarize, with long WAV files sent as concurrent chunks."""
+
+    name = "openai"
+
+    async def id(self) -> str:
+        return "openai:gpt-4o-transcribe-diarize"
+
+    def available(self) -> bool:
+        return bool(OPENAI_API_KEY)
+
+    async def transcribe(self, audio_filepath: str, report: dict = None) -> list:
+        return await transcribe_openai(audio_filepath)
+
+    async def stream(self, audio_filepath: str, chunk_seconds: float = CHUNK_SECONDS, report: dict = None):
+        if (await asyncio.to_thread(probe_audio, audio_filepath))["format"] != "wav":
+            yield await transcribe_openai(audio_filepath)
+            return
+        async for segments in stream_openai(audio_filepath, chunk_seconds):
+            yield segments
+
+
+class LocalBackend(TranscriptionBackend):
+    """
+    Offline diarization and Whisper, in-process or on the shared model server.
+
+    Jobs running in this process are counted so the auto-router can see how
+    busy the local path is; with a model server, its own queue is used.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self.active = 0
+
+    async def id(self) -> str:
+        # With a model server, name the models it runs; reading them here would import torch.
+        if MODEL_SERVER_SOCKET:
+            engines = await server_engines()
+            return f"local:{engines['diarization']}+{engines['whisper']}"
+        return f"local:{diarization_engine_id()}+{whisper_model_id()}"
+
+    async def queue_depth(self):
+        """Returns the number of local jobs running or waiting, or None if the server is down."""
+        if MODEL_SERVER_SOCKET:
+            status = await server_status()
+            return None if status is None else status["queued"] + int(status["running"])
+        return self.active
+
+    async def transcribe(self, audio_filepath: str, report: dict = None) -> list:
+        self.active += 1
+        try:
+            if MODEL_SERVER_SOCKET:
+                return await transcribe_on_server(audio_filepath, CHUNK_SECONDS)
+            return await asyncio.to_thread(transcribe_with_diarization, audio_filepath)
+        finally:
+            self.active -= 1
+
+    async def stream(self, audio_filepath: str, chunk_seconds: float = CHUNK_SECONDS, report: dict = None):
+        if MODEL_SERVER_SOCKET:
+            stream = stream_from_server(audio_filepath, chunk_seconds)
+        else:
+            stream = stream_with_diarization(audio_filepath, chunk_seconds)
+        self.active += 1
+        try:
+            async for segments in stream:
+                yield segments
+        finally:
+            self.active -= 1
+            await stream.aclose()
+
+
+class StereoBackend(TranscriptionBackend):
+    """Dual-channel recordings: one single-speaker transcription per channel, no diarization."""
+
+    def __init__(self, engine: str):
+        self.engine = engine
+        self.name = f"{engine}-stereo"
+
+    async def id(self) -> str:
+        if self.engine == "local":
+            if MODEL_SERVER_SOCKET:
+                return f"local-stereo:{(await server_engines())['whisper']}"
+            return f"local-stereo:{whisper_model_id()}"
+        return "openai-stereo:whisper-1"
+
+    async def transcribe(self, audio_filepath: str, report: dict = None) -> list:
+        if self.engine == "local":
+            if MODEL_SERVER_SOCKET:
+                return await transcribe_stereo_on_server(audio_filepath, STEREO_SPEAKERS)
+            return await asyncio.to_thread(transcribe_stereo_local, audio_filepath, STEREO_SPEAKERS)
+        if not OPENAI_API_KEY:
+            raise Exception("OPENAI_API_KEY not found in environment.")
+        return await transcribe_stereo_openai(
+            audio_filepath, STEREO_SPEAKERS, CHUNK_SECONDS, CHUNK_MARGIN, TRANSCRIBE_CONCURRENCY,
+        )
+
+
+class VadBackend(TranscriptionBackend):
+    """
+    Runs another backend on the speech regions only.
+
+    Dead air and hold music are cut out before transcription and the
+    timestamps are mapped back to the original recording, so per-minute
+    buckets stay correct. The skip report goes into `report['vad']`.
+    """
+
+    def __init__(self, inner: TranscriptionBackend):
+        self.inner = inner
+        self.name = inner.name
+
+    async def id(self) -> str:
+        return await self.inner.id() + "+vad"
+
+    async def _trim(self, audio_filepath: str, report: dict) -> tuple:
+        trimmed_path, timeline, vad_report = await asyncio.to_thread(trim_silence, audio_filepath, VAD_MIN_SKIP_SECONDS)
+        if vad_report and report is not None:
+            report["vad"] = vad_report
+        return trimmed_path, timeline
+
+    async def transcribe(self, audio_filepath: str, report: dict = None) -> list:
+        trimmed_path, timeline = await self._trim(audio_filepath, report)
+        try:
+            transcript = await self.inner.transcribe(trimmed_path or audio_filepath, report)
+        finally:
+            if trimmed_path:
+                os.remove(trimmed_path)
+        return map_transcript(transcript, timeline) if timeline else transcript
+
+    async def stream(self, audio_filepath: str, chunk_seconds: float = CHUNK_SECONDS, report: dict = None):
+        trimmed_path, timeline = await self._trim(audio_filepath, report)
+        stream = self.inner.stream(trimmed_path or audio_filepath, chunk_seconds, report)
+        try:
+            async for segments in stream:
+                yield map_transcript(segments, timeline) if timeline else segments
+        finally:
+            await stream.aclose()
+            if trimmed_path:
+                os.remove(trimmed_path)
+
+
+class CachedBackend(TranscriptionBackend):
+    """
+    Serves transcripts from the SQLite cache, keyed by audio content and backend.
+
+    Misses are transcribed by the wrapped backend and stored; a streamed
+    transcript is stored once the stream completes.
+    """
+
+    def __init__(self, inner: TranscriptionBackend):
+        self.inner = inner
+        self.name = inner.name
+
+    async def id(self) -> str:
+        return await self.inner.id()
+
+    async def _lookup(self, audio_filepath: str, report: dict) -> tuple:
+        key = await asyncio.to_thread(TranscriptCache.key, audio_filepath, await self.inner.id())
+        cached = await asyncio.to_thread(get_transcript_cache().get, key)
+        if cached is not None:
+            print(f"Transcript cache hit for {audio_filepath}")
+        if report is not None:
+            report["cache"] = "hit" if cached is not None else "miss"
+        return key, cached
+
+    async def transcribe(self, audio_filepath: str, report: dict = None) -> list:
+        key, cached = await self._lookup(audio_filepath, report)
+        if cached is not None:
+            return cached
+        transcript = await self.inner.transcribe(audio_filepath, report)
+        await asyncio.to_thread(get_transcript_cache().put, key, transcript)
+        return transcript
+
+    async def stream(self, audio_filepath: str, chunk_seconds: float = CHUNK_SECONDS, report: dict = None):
+        key, cached = await self._lookup(audio_filepath, report)
+        if cached is not None:
+            yield cached
+            return
+        transcript = []
+        async for segments in self.inner.stream(audio_filepath, chunk_seconds, report):
+            transcript.extend(segments)
+            yield segments
+        await asyncio.to_thread(get_transcript_cache().put, key, transcript)
+
+
+BACKENDS = {}
+
+
+def register_backend(backend: TranscriptionBackend) -> TranscriptionBackend:
+    """Makes a backend selectable by its name."""
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+register_backend(OpenAIBackend())
+register_backend(LocalBackend())
+register_backend(StereoBackend("openai"))
+register_backend(StereoBackend("local"))
+
+
+async def auto_route(audio_filepath: str) -> str:
+    """
+    Chooses between the OpenAI and local backends for one call.
+
+    Short calls go to OpenAI, the lowest-latency path. Longer calls go to the
+    local backend, which costs nothing per minute, unless its queue is full
+    or the model server is unreachable.
+
+    Args:
+        audio_filepath (str): The path to the audio file.
+
+    Returns:
+        str: "openai" or "local".
+    """
+    if not BACKENDS["openai"].available():
+        return "local"
+    duration = (await asyncio.to_thread(probe_audio, audio_filepath))["duration"]
+    if duration is None or duration <= ROUTE_SHORT_SECONDS:
+        return "openai"
+    depth = await BACKENDS["local"].queue_depth()
+    if depth is None or depth >= ROUTE_MAX_LOCAL_QUEUE:
+        return "openai"
+    return "local"
+
+
+async def route_backend(audio_filepath: str) -> str:
+    """Returns the name of the registered backend that should transcribe a file."""
+    engine = TRANSCRIBE_BACKEND
+    if engine == "auto":
+        engine = await auto_route(audio_filepath)
+    if engine in ("openai", "local") and STEREO_SPLIT != "off":
+        if await asyncio.to_thread(is_dual_channel, audio_filepath):
+            return f"{engine}-stereo"
+    return engine
+
+
+async def select_backend(audio_filepath: str) -> TranscriptionBackend:
+    """
+    Routes a file to a registered backend and wraps it in the VAD and cache stages.
+
+    Args:
+        audio_filepath (str): The path to the audio file.
+
+    Returns:
+        TranscriptionBackend: The backend to transcribe the file with.
+    """
+    name = await route_backend(audio_filepath)
+    if name not in BACKENDS:
+        raise Exception(f"Unknown transcription backend: {name}. Registered: {', '.join(BACKENDS)}.")
+    backend = BACKENDS[name]
+    if VAD_ENABLED:
+        backend = VadBackend(backend)
+    if TRANSCRIPT_CACHE_ENABLED:
+        backend = CachedBackend(backend)
+    return backend
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Same SQLite file as the session service; the cache lives in its own tables.
+CACHE_DB_PATH = os.getenv("SAGE_TRANSCRIPT_CACHE_DB", "./my_agent_data.db")
+# Total size of cached transcripts before the least recently used are evicted.
+CACHE_MAX_BYTES = int(os.getenv("SAGE_TRANSCRIPT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_audio(audio_filepath: str) -> str:
+    """Returns the SHA-256 of the audio file's bytes."""
+    digest = hashlib.sha256()
+    with open(audio_filepath, "rb") as audio_file:
+        for block in iter(lambda: audio_file.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Persistent transcript cache keyed by audio content and transcription backend.
+
+    Entries are [start, end, speaker, text] transcripts stored as JSON. When the
+    stored transcripts grow past `max_bytes`, the least recently used ones are
+    evicted. Hits and misses are counted in the same database so the counters
+    survive restarts.
+    """
+
+    def __init__(self, db_path: str = CACHE_DB_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS transcript_cache (
+                    key TEXT PRIMARY KEY,
+                    transcript TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS transcript_cache_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def key(audio_filepath: str, backend: str) -> str:
+        """Builds the cache key of an audio file transcribed with `backend`."""
+        return f"{hash_audio(audio_filepath)}:{backend}"
+
+    def get(self, key: str):
+        """Returns the cached transcript for `key`, or None, and counts the lookup."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT transcript FROM transcript_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE transcript_cache SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            self._increment(conn, "hits" if row else "misses")
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, transcript: list) -> None:
+        """Stores a transcript and evicts old entries if the cache is over size."""
+        payload = json.dumps(transcript)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcript_cache VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._evict(conn)
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counters and the current cache size."""
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM transcript_cache_stats"))
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcript_cache"
+            ).fetchone()
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def _increment(self, conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute(
+            """INSERT INTO transcript_cache_stats VALUES (?, ?)
+               ON CONFLICT(name) DO UPDATE SET value = value + excluded.value""",
+            (name, amount),
+        )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcript_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM transcript_cache ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM transcript_cache WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._increment(conn, "evictions", evicted)
+
+
+@lru_cache(maxsize=None)
+def get_transcript_cache() -> TranscriptCache:
+    """
+    Returns the shared transcript cache, creating its tables on first use.
+
+    Nothing is opened at import, so processes that never look up a transcript,
+    such as the model server and its pool workers, or a run with the cache
+    disabled, leave the database alone.
+    """
+    return TranscriptCache()
@@ -0,0 +1,195 @@
+import numpy as np
+from .audio import TARGET_SAMPLE_RATE, encode_wav, memmap_wav, resample, to_mono_float32, wav_layout
+
+# Frame length used to measure loudness when looking for silence.
+ENERGY_FRAME_SECONDS = 0.05
+# A frame is voiced when it is this many dB above the recording's noise floor (and above the minimum).
+_VOICED_ABOVE_FLOOR_DB = 10.0
+_MIN_VOICED_DB = -55.0
+
+
+def wav_duration(audio_path: str) -> float:
+    """Returns the duration of a WAV file in seconds."""
+    layout = wav_layout(audio_path)
+    return layout["frames"] / layout["sample_rate"]
+
+
+def signal_energy(mono: np.ndarray, sample_rate: int, frame_seconds: float = ENERGY_FRAME_SECONDS) -> np.ndarray:
+    """Computes the RMS loudness of consecutive frames of a mono signal."""
+    frame_length = max(1, int(frame_seconds * sample_rate))
+    usable = len(mono) - len(mono) % frame_length
+    frames = mono[:usable].reshape(-1, frame_length)
+    return np.sqrt((frames ** 2).mean(axis=1))
+
+
+def frame_energy(audio_path: str, frame_seconds: float = ENERGY_FRAME_SECONDS) -> np.ndarray:
+    """
+    Computes the RMS loudness of consecutive frames of a PCM WAV file.
+
+    Args:
+        audio_path (str): The path to the WAV file.
+        frame_seconds (float): Length of each frame in seconds.
+
+    Returns:
+        np.ndarray: One RMS value per frame, averaged over channels.
+    """
+    samples, sample_rate = memmap_wav(audio_path)
+    return signal_energy(to_mono_float32(samples), sample_rate, frame_seconds)
+
+
+def voiced_frames(energy: np.ndarray) -> np.ndarray:
+    """Flags the frames loud enough above the recording's noise floor to be speech."""
+    if len(energy) == 0:
+        return np.zeros(0, dtype=bool)
+    levels = 20 * np.log10(np.maximum(energy, 1e-6))
+    return levels > max(np.percentile(levels, 10) + _VOICED_ABOVE_FLOOR_DB, _MIN_VOICED_DB)
+
+
+def plan_boundaries(energy: np.ndarray, duration: float, chunk_seconds: float, margin: float,
+                    min_speech: float = 0.0) -> list:
+    """
+    Splits [0, duration] into chunks that end in the quietest nearby moment.
+
+    Each boundary is placed at the lowest-energy frame within a quarter chunk
+    (at most 10 s) of the nominal cut point, so words are rarely split
+    between chunks. Since that moment is quiet, a fixed margin may hold no
+    speech at all; with `min_speech` set, the margin is extended backwards
+    until it holds that many seconds of voiced frames, or reaches the
+    previous boundary.
+
+    Args:
+        energy (np.ndarray): Frame energies, one per ENERGY_FRAME_SECONDS.
+        duration (float): Total audio length in seconds.
+        chunk_seconds (float): Nominal length of each chunk.
+        margin (float): Seconds each chunk re-reads from the end of the previous one, at least.
+        min_speech (float): Seconds of voiced audio each margin must contain.
+
+    Returns:
+        list: (read_start, boundary, end) tuples. The chunk reads audio from
+            `read_start`, owns the audio from `boundary` on, and stops at `end`.
+    """
+    search = min(10.0, chunk_seconds / 4) / ENERGY_FRAME_SECONDS
+
+    boundaries = [0.0]
+    while duration - boundaries[-1] > chunk_seconds:
+        target = (boundaries[-1] + chunk_seconds) / ENERGY_FRAME_SECONDS
+        low = max(int(target - search), int(boundaries[-1] / ENERGY_FRAME_SECONDS) + 1)
+        high = min(int(target + search), len(energy))
+        if low >= high:
+            boundaries.append(boundaries[-1] + chunk_seconds)
+            continue
+        quietest = low + int(np.argmin(energy[low:high]))
+        boundaries.append((quietest + 0.5) * ENERGY_FRAME_SECONDS)
+    boundaries.append(duration)
+
+    read_starts = [max(0.0, boundary - margin) for boundary in boundaries[:-1]]
+    if min_speech > 0:
+        voiced = np.concatenate(([0], np.cumsum(voiced_frames(energy))))
+        needed = min_speech / ENERGY_FRAME_SECONDS
+        for index in range(1, len(read_starts)):
+            frame = min(int(boundaries[index] / ENERGY_FRAME_SECONDS), len(voiced) - 1)
+            # The latest frame from which at least `needed` voiced frames lead up to the boundary.
+            first = int(np.searchsorted(voiced, voiced[frame] - needed, side="right")) - 1
+            extended = max(first * ENERGY_FRAME_SECONDS, boundaries[index - 1])
+            read_starts[index] = min(read_starts[index], extended)
+
+    return [
+        (read_start, boundary, end)
+        for read_start, boundary, end in zip(read_starts, boundaries[:-1], boundaries[1:])
+    ]
+
+
+def plan_silence_chunks(audio_path: str, chunk_seconds: float, margin: float, min_speech: float = 0.0) -> list:
+    """Plans silence-aligned chunks of a PCM WAV file; see plan_boundaries()."""
+    return plan_boundaries(frame_energy(audio_path), wav_duration(audio_path), chunk_seconds, margin, min_speech)
+
+
+def read_wav_chunk(audio_path: str, start: float, end: float) -> bytes:
+    """
+    Extracts [start, end) of a WAV file as a standalone 16 kHz mono 16-bit WAV file.
+
+    Args:
+        audio_path (str): The path to the WAV file.
+        start (float): Start of the chunk in seconds.
+        end (float): End of the chunk in seconds.
+
+    Returns:
+        bytes: The encoded WAV chunk.
+    """
+    samples, sample_rate = memmap_wav(audio_path)
+    chunk = to_mono_float32(samples[int(start * sample_rate):int(end * sample_rate)])
+    return encode_wav(resample(chunk, sample_rate, TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE)
+
+
+def fresh_label(taken: set) -> str:
+    """Returns the first SPEAKER_NN label that is not in `taken`."""
+    number = 0
+    while f"SPEAKER_{number:02d}" in taken:
+        number += 1
+    return f"SPEAKER_{number:02d}"
+
+
+def reconcile_chunk(transcript: list, segments: list, read_start: float, boundary: float,
+                    previous_mapping: dict = None) -> tuple:
+    """
+    Maps a chunk's speaker labels onto the labels already in the transcript.
+
+    Consecutive chunks share the audio in [read_start, boundary]. Each local
+    label is matched to the transcript label it overlaps most in that margin.
+    A label with no overlap keeps the transcript label it had in the previous
+    chunk, if that one is still free, rather than being assigned by the order
+    labels appear in, which the diarizer picks arbitrarily per chunk. Other
+    labels take any transcript label not matched yet, so two speakers stay
+    two speakers, and once none is left a fresh SPEAKER_NN label, so a new
+    speaker never merges into a known one. Segments centred inside the margin
+    were already transcribed by the previous chunk and are dropped.
+
+    Args:
+        transcript (list): The reconciled segments of all earlier chunks.
+        segments (list): The new chunk's segments, already on the global timeline.
+        read_start (float): Where the new chunk starts reading audio.
+        boundary (float): Where the new chunk's own audio starts.
+        previous_mapping (dict): The mapping returned for the previous chunk.
+
+    Returns:
+        tuple: (the new chunk's segments with reconciled labels, the mapping
+            from its local labels to transcript labels).
+    """
+    if not transcript:
+        return segments, {label: label for _, _, label, _ in segments}
+
+    previous = [segment for segment in transcript if segment[1] > read_start]
+    overlap = {}
+    for start, end, label, _ in segments:
+        for p_start, p_end, p_label, _ in previous:
+            shared = min(end, p_end, boundary) - max(start, p_start, read_start)
+            if shared > 0:
+                overlap[(label, p_label)] = overlap.get((label, p_label), 0.0) + shared
+
+    mapping = {}
+    used = set()
+    for (label, p_label), _ in sorted(overlap.items(), key=lambda item: -item[1]):
+        if label not in mapping and p_label not in used:
+            mapping[label] = p_label
+            used.add(p_label)
+
+    for _, _, label, _ in segments:
+        kept = (previous_mapping or {}).get(label)
+        if label not in mapping and kept is not None and kept not in used:
+            mapping[label] = kept
+            used.add(kept)
+
+    known = list(dict.fromkeys(p_label for _, _, p_label, _ in transcript))
+    spare = [p_label for p_label in known if p_label not in used]
+    taken = set(known)
+    for _, _, label, _ in segments:
+        if label not in mapping:
+            mapping[label] = spare.pop(0) if spare else fresh_label(taken)
+            taken.add(mapping[label])
+
+    reconciled = [
+        [start, end, mapping[label], text]
+        for start, end, label, text in segments
+        if (start + end) / 2 >= boundary
+    ]
+    return reconciled, mapping
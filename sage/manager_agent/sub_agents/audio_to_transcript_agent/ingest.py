@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+import struct
+import subprocess
+import wave
+from .audio import TARGET_SAMPLE_RATE, encode_wav, memmap_wav, resample, to_mono_float32, wav_layout
+
+SUPPORTED_FORMATS = ("wav", "mp3", "ogg", "flac")
+# Bitrate of the mono 16 kHz MP3 sent to the transcription API.
+UPLOAD_BITRATE = os.getenv("SAGE_UPLOAD_BITRATE", "32k")
+
+
+def sniff_format(audio_path: str) -> str:
+    """
+    Identifies an audio container from its leading bytes.
+
+    Args:
+        audio_path (str): The path to the audio file.
+
+    Returns:
+        str: One of SUPPORTED_FORMATS, or None if the header is not recognised.
+    """
+    with open(audio_path, "rb") as f:
+        header = f.read(12)
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:3] == b"ID3" or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+def probe_audio(audio_path: str) -> dict:
+    """
+    Validates an audio file before anything is spent transcribing it.
+
+    The container is identified from its header. WAV headers are parsed
+    directly; compressed formats are checked with ffprobe when it is
+    available.
+
+    Args:
+        audio_path (str): The path to the audio file.
+
+    Returns:
+        dict: 'format', 'duration' (seconds, None if unknown) and 'bytes'.
+
+    Raises:
+        ValueError: If the file is empty, not a supported format, or corrupt.
+    """
+    size = os.path.getsize(audio_path)
+    if size == 0:
+        raise ValueError("The audio file is empty.")
+
+    audio_format = sniff_format(audio_path)
+    if audio_format is None:
+        raise ValueError(f"Unsupported audio format. Supported formats: {', '.join(SUPPORTED_FORMATS)}.")
+
+    duration = None
+    if audio_format == "wav":
+        try:
+            layout = wav_layout(audio_path)
+        except (wave.Error, struct.error) as e:
+            raise ValueError(f"Corrupt WAV file: {e}")
+        if not layout["frames"] or not layout["sample_rate"]:
+            raise ValueError("The WAV file contains no audio.")
+        duration = layout["frames"] / layout["sample_rate"]
+    elif shutil.which("ffprobe"):
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", audio_path],
+            capture_output=True,
+            text=True,
+        )
+        try:
+            duration = float(json.loads(result.stdout)["format"]["duration"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Corrupt {audio_format} file: {result.stderr.strip() or 'no duration found'}")
+        if result.returncode != 0 or duration <= 0:
+            raise ValueError(f"Corrupt {audio_format} file: {result.stderr.strip() or 'no audio found'}")
+
+    return {"format": audio_format, "duration": duration, "bytes": size}
+
+
+def transcode_for_upload(audio_path: str) -> tuple:
+    """
+    Re-encodes an audio file to compact 16 kHz mono speech for upload.
+
+    With ffmpeg available the file becomes a mono 16 kHz MP3 at
+    SAGE_UPLOAD_BITRATE. Without it, WAV files are still downmixed and
+    resampled to 16 kHz 16-bit mono with NumPy; other formats are sent as-is.
+
+    Args:
+        audio_path (str): The path to the audio file.
+
+    Returns:
+        tuple: (filename, encoded bytes), ready to pass as an upload file.
+    """
+    original_size = os.path.getsize(audio_path)
+    if shutil.which("ffmpeg"):
+        result = subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-i", audio_path,
+                "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE),
+                "-c:a", "libmp3lame", "-b:a", UPLOAD_BITRATE,
+                "-f", "mp3", "pipe:1",
+            ],
+            capture_output=True,
+        )
+        if result.returncode == 0 and result.stdout:
+            upload = ("audio.mp3", result.stdout)
+        else:
+            print(f"ffmpeg transcoding failed, uploading the original: {result.stderr.decode(errors='ignore').strip()}")
+            upload = None
+    else:
+        upload = None
+
+    if upload is None and sniff_format(audio_path) == "wav":
+        try:
+            samples, sample_rate = memmap_wav(audio_path)
+            mono = resample(to_mono_float32(samples), sample_rate, TARGET_SAMPLE_RATE)
+            upload = ("audio.wav", encode_wav(mono, TARGET_SAMPLE_RATE))
+        except (wave.Error, struct.error):
+            upload = None
+
+    if upload is None:
+        with open(audio_path, "rb") as f:
+            upload = (os.path.basename(audio_path), f.read())
+
+    print(f"Upload size: {len(upload[1])} bytes (original {original_size} bytes)")
+    return upload
@@ -0,0 +1,212 @@
+import numpy as np
+from .audio import TARGET_SAMPLE_RATE
+
+# Analysis frames: 25 ms windows every 10 ms, the usual MFCC framing for speech.
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.01
+# Speaker embeddings are MFCC statistics over windows of this length and hop.
+EMBEDDING_WINDOW_SECONDS = 1.5
+EMBEDDING_HOP_SECONDS = 0.5
+
+_N_FFT = 512
+_N_MELS = 40
+_N_MFCC = 13
+_FRAME_BLOCK = 16384
+_SPEECH_ABOVE_FLOOR_DB = 10.0
+_MIN_SPEECH_DB = -55.0
+_MIN_PAUSE_SECONDS = 0.3
+_MIN_SPEECH_SECONDS = 0.2
+_MIN_WINDOW_SPEECH = 0.3
+_LABEL_SMOOTHING_SECONDS = 0.5
+_KMEANS_ITERATIONS = 20
+
+
+def mel_filterbank(sample_rate: int = TARGET_SAMPLE_RATE, n_fft: int = _N_FFT, n_mels: int = _N_MELS) -> np.ndarray:
+    """Builds triangular mel filters of shape (n_mels, n_fft // 2 + 1)."""
+    mel_edges = np.linspace(0, 2595 * np.log10(1 + sample_rate / 2 / 700), n_mels + 2)
+    hz_edges = 700 * (10 ** (mel_edges / 2595) - 1)
+    bins = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+    lower, center, upper = hz_edges[:-2, None], hz_edges[1:-1, None], hz_edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0, np.minimum(rising, falling)).astype(np.float32)
+
+
+def dct_matrix(n_mfcc: int = _N_MFCC, n_mels: int = _N_MELS) -> np.ndarray:
+    """Builds the orthonormal DCT-II matrix of shape (n_mfcc, n_mels)."""
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    basis = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2 / n_mels)
+    basis[0] /= np.sqrt(2)
+    return basis.astype(np.float32)
+
+
+def mfcc_features(waveform: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> tuple:
+    """
+    Computes MFCCs and log energy of every 10 ms frame of a mono signal.
+
+    Frames are processed in blocks so memory stays bounded on long calls.
+
+    Args:
+        waveform (np.ndarray): The mono float32 signal.
+        sample_rate (int): Its sample rate.
+
+    Returns:
+        tuple: (MFCCs of shape (frames, _N_MFCC) without c0, log energy in dB per frame).
+    """
+    frame_length = int(FRAME_SECONDS * sample_rate)
+    hop = int(HOP_SECONDS * sample_rate)
+    frame_count = max(0, 1 + (len(waveform) - frame_length) // hop)
+    if frame_count == 0:
+        return np.zeros((0, _N_MFCC - 1), dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+    frames = np.lib.stride_tricks.sliding_window_view(waveform, frame_length)[::hop][:frame_count]
+    window = np.hamming(frame_length).astype(np.float32)
+    filters = mel_filterbank(sample_rate)
+    dct = dct_matrix()
+
+    mfccs = np.empty((frame_count, _N_MFCC - 1), dtype=np.float32)
+    energy = np.empty(frame_count, dtype=np.float32)
+    for start in range(0, frame_count, _FRAME_BLOCK):
+        block = frames[start:start + _FRAME_BLOCK]
+        energy[start:start + len(block)] = 10 * np.log10(np.maximum((block ** 2).mean(axis=1), 1e-12))
+        power = np.abs(np.fft.rfft(block * window, n=_N_FFT)) ** 2
+        log_mel = np.log(np.maximum(power @ filters.T, 1e-10))
+        mfccs[start:start + len(block)] = (log_mel @ dct.T)[:, 1:]
+    return mfccs, energy
+
+
+def fill_short_runs(mask: np.ndarray, value: bool, max_frames: int) -> np.ndarray:
+    """Flips interior runs of `value` that are at most `max_frames` frames long."""
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(mask.astype(np.int8))) + 1, [len(mask)]))
+    filled = mask.copy()
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if mask[start] == value and end - start <= max_frames and 0 < start and end < len(mask):
+            filled[start:end] = not value
+    return filled
+
+
+def speech_mask(energy: np.ndarray) -> np.ndarray:
+    """Marks speech frames: above the noise floor, with short pauses bridged and blips removed."""
+    if len(energy) == 0:
+        return np.zeros(0, dtype=bool)
+    floor = np.percentile(energy, 10)
+    mask = energy > max(floor + _SPEECH_ABOVE_FLOOR_DB, _MIN_SPEECH_DB)
+    mask = fill_short_runs(mask, False, int(_MIN_PAUSE_SECONDS / HOP_SECONDS))
+    return fill_short_runs(mask, True, int(_MIN_SPEECH_SECONDS / HOP_SECONDS))
+
+
+def window_embeddings(mfccs: np.ndarray, speech: np.ndarray) -> tuple:
+    """
+    Computes MFCC mean and standard deviation over speech frames of sliding windows.
+
+    Window sums come from cumulative sums, so the cost does not depend on
+    the window length.
+
+    Returns:
+        tuple: (embeddings of shape (windows, 2 * features), first frame of each window).
+    """
+    window = int(EMBEDDING_WINDOW_SECONDS / HOP_SECONDS)
+    hop = int(EMBEDDING_HOP_SECONDS / HOP_SECONDS)
+    starts = np.arange(0, max(1, len(mfccs) - window + 1), hop)
+    weights = speech.astype(np.float64)[:, None]
+
+    def window_sums(values):
+        cumulative = np.concatenate((np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)))
+        ends = np.minimum(starts + window, len(values))
+        return cumulative[ends] - cumulative[starts]
+
+    counts = window_sums(weights)[:, 0]
+    keep = counts >= _MIN_WINDOW_SPEECH * window
+    sums = window_sums(mfccs * weights)
+    squares = window_sums(mfccs.astype(np.float64) ** 2 * weights)
+    counts, sums, squares, starts = counts[keep, None], sums[keep], squares[keep], starts[keep]
+    means = sums / counts
+    stds = np.sqrt(np.maximum(squares / counts - means ** 2, 0))
+    return np.hstack((means, stds)), starts
+
+
+def two_means(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Splits embeddings into two clusters with k-means.
+
+    Embeddings are standardized per dimension; the centroids start at the
+    point farthest from the mean and the point farthest from that one.
+
+    Returns:
+        np.ndarray: 0/1 label per embedding, label 0 for the cluster of the first window.
+    """
+    scaled = (embeddings - embeddings.mean(axis=0)) / (embeddings.std(axis=0) + 1e-8)
+    first = np.argmax(((scaled - scaled.mean(axis=0)) ** 2).sum(axis=1))
+    second = np.argmax(((scaled - scaled[first]) ** 2).sum(axis=1))
+    centroids = scaled[[first, second]]
+
+    labels = None
+    for _ in range(_KMEANS_ITERATIONS):
+        distances = ((scaled[:, None, :] - centroids[None]) ** 2).sum(axis=2)
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for cluster in range(2):
+            if (labels == cluster).any():
+                centroids[cluster] = scaled[labels == cluster].mean(axis=0)
+    return labels if labels[0] == 0 else 1 - labels
+
+
+def frame_labels(labels: np.ndarray, window_starts: np.ndarray, frame_count: int) -> np.ndarray:
+    """Gives every frame the label of the nearest window centre, then smooths it by majority vote."""
+    centers = window_starts + int(EMBEDDING_WINDOW_SECONDS / HOP_SECONDS) // 2
+    nearest = np.clip(np.searchsorted(centers, np.arange(frame_count)), 1, len(centers) - 1)
+    closer_left = np.arange(frame_count) - centers[nearest - 1] < centers[nearest] - np.arange(frame_count)
+    per_frame = labels[np.where(closer_left, nearest - 1, nearest)]
+
+    half = int(_LABEL_SMOOTHING_SECONDS / HOP_SECONDS) // 2
+    cumulative = np.concatenate(([0], np.cumsum(per_frame)))
+    low = np.maximum(np.arange(frame_count) - half, 0)
+    high = np.minimum(np.arange(frame_count) + half + 1, frame_count)
+    return ((cumulative[high] - cumulative[low]) * 2 > high - low).astype(np.int64)
+
+
+def lite_diarize(waveform: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> list:
+    """
+    Diarizes a two-party call with NumPy only: VAD, MFCC statistics and two-means.
+
+    Speech frames are found from their energy, every 1.5 s window of speech
+    is embedded as the mean and spread of its MFCCs, the windows are split
+    into two speakers with k-means, and each speech frame takes its nearest
+    window's speaker. Much faster than pyannote on CPU, at some cost in
+    accuracy around quick turn changes and overlapping speech.
+
+    Args:
+        waveform (np.ndarray): The 16 kHz mono float32 waveform.
+        sample_rate (int): Its sample rate.
+
+    Returns:
+        list: Unmerged segments as dicts with 'start', 'end' and 'label' keys,
+            labelled SPEAKER_00 and SPEAKER_01 like pyannote.
+    """
+    mfccs, energy = mfcc_features(waveform, sample_rate)
+    speech = speech_mask(energy)
+    if not speech.any():
+        return []
+
+    embeddings, window_starts = window_embeddings(mfccs, speech)
+    if len(embeddings) >= 2:
+        labels = frame_labels(two_means(embeddings), window_starts, len(speech))
+    else:
+        labels = np.zeros(len(speech), dtype=np.int64)
+
+    # A run ends wherever speech stops or the speaker changes.
+    state = np.where(speech, labels, -1)
+    changes = np.flatnonzero(np.diff(state)) + 1
+    bounds = np.concatenate(([0], changes, [len(state)]))
+    return [
+        {
+            'start': float(start * HOP_SECONDS),
+            'end': float(end * HOP_SECONDS + FRAME_SECONDS - HOP_SECONDS),
+            'label': f"SPEAKER_{state[start]:02d}",
+        }
+        for start, end in zip(bounds[:-1], bounds[1:])
+        if state[start] >= 0
+    ]
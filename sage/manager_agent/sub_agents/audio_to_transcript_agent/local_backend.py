@@ -0,0 +1,260 @@
+import asyncio
+import os
+import time
+from .audio import TARGET_SAMPLE_RATE, load_audio
+from .lite_diarization import lite_diarize
+from .models import get_device, registry
+from .turns import TURN_MERGE_GAP, TURN_MIN_DURATION, TURN_OVERLAP, merge_turns
+from .whisper_pool import whisper_pool
+
+# Segments decoded per Whisper forward pass. 1 falls back to one transcribe() call per segment.
+WHISPER_BATCH_SIZE = int(os.getenv("SAGE_WHISPER_BATCH_SIZE", "16"))
+# Same safeguards as whisper's transcribe(): a clip is re-decoded at the next temperature while its
+# text is repetitive or improbable, and dropped when it is likely not speech.
+_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+_COMPRESSION_RATIO_THRESHOLD = 2.4
+_LOGPROB_THRESHOLD = -1.0
+_NO_SPEECH_THRESHOLD = 0.6
+# "pyannote" (default) or "lite" for the NumPy two-speaker diarizer.
+DIARIZATION_ENGINE = os.getenv("SAGE_DIARIZATION_ENGINE", "pyannote")
+
+
+def diarization_engine_id() -> str:
+    """Names the configured diarization engine and turn clean-up, for cache keys."""
+    turns = f"turns-{TURN_MERGE_GAP:g}-{TURN_MIN_DURATION:g}-{TURN_OVERLAP}"
+    if DIARIZATION_ENGINE == "lite":
+        return f"lite-mfcc-2means+{turns}"
+    return f"pyannote/speaker-diarization-3.1+{turns}"
+
+
+def diarize_pyannote(audio_waveform) -> list:
+    """Runs the pyannote pipeline and returns its unmerged turns as dicts."""
+    import torch
+
+    pipeline = registry.get("diarization")
+    audio = {
+        "waveform": torch.from_numpy(audio_waveform).unsqueeze(0),
+        "sample_rate": TARGET_SAMPLE_RATE,
+    }
+    start = time.perf_counter()
+    diarization = pipeline(audio, num_speakers=2)
+    registry.record_inference("diarization", time.perf_counter() - start)
+
+    return [
+        {'start': segment.start, 'end': segment.end, 'label': label}
+        for segment, track_id, label in diarization.itertracks(yield_label=True)
+    ]
+
+
+def diarize(audio_waveform) -> list:
+    """
+    Runs speaker diarization and cleans up the turns for transcription.
+
+    SAGE_DIARIZATION_ENGINE picks pyannote or the faster, less accurate
+    NumPy diarizer in lite_diarization; both yield the same turn structure.
+    merge_turns then joins same-speaker turns across short gaps, resolves
+    overlapping speech and drops fragments too short to transcribe.
+
+    Args:
+        audio_waveform: The 16 kHz mono float32 waveform, as returned by
+            load_audio(). pyannote reads it through a tensor over the same
+            memory instead of decoding the file again.
+
+    Returns:
+        list: Merged segments as dicts with 'start', 'end' and 'label' keys.
+    """
+    if DIARIZATION_ENGINE == "lite":
+        all_segments = lite_diarize(audio_waveform)
+    else:
+        all_segments = diarize_pyannote(audio_waveform)
+
+    return merge_turns(all_segments)
+
+
+def needs_fallback(result) -> bool:
+    """True when a decoding result should be retried at a higher temperature, as transcribe() does."""
+    if result.no_speech_prob > _NO_SPEECH_THRESHOLD:
+        return False
+    return result.compression_ratio > _COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < _LOGPROB_THRESHOLD
+
+
+def is_silence(result) -> bool:
+    """True when transcribe() would skip the clip as non-speech."""
+    return result.no_speech_prob > _NO_SPEECH_THRESHOLD and result.avg_logprob < _LOGPROB_THRESHOLD
+
+
+def decode_batched(whisper_model, segments_audio: list, batch_size: int) -> list:
+    """
+    Decodes many short clips with batched encoder and decoder passes.
+
+    Clips up to Whisper's 30 s window are padded to the window, stacked into
+    batches of log-mel spectrograms and decoded greedily together. Like
+    transcribe(), clips whose text is repetitive or improbable are decoded
+    again at increasing temperatures, and clips that are probably not speech
+    come back empty instead of as made-up text. Longer clips need Whisper's
+    sliding-window transcription and go through transcribe().
+
+    Args:
+        whisper_model: A loaded Whisper model.
+        segments_audio (list): 16 kHz float32 waveforms.
+        batch_size (int): Clips per forward pass.
+
+    Returns:
+        list: The decoded text of each clip, in input order.
+    """
+    import torch
+    import whisper
+
+    fp16 = get_device() == "cuda"
+    texts = [""] * len(segments_audio)
+    short = []
+    for i, audio in enumerate(segments_audio):
+        if len(audio) <= whisper.audio.N_SAMPLES:
+            short.append(i)
+        else:
+            texts[i] = whisper_model.transcribe(audio, fp16=fp16)['text'].strip()
+
+    pending = short
+    for temperature in _TEMPERATURES:
+        options = whisper.DecodingOptions(fp16=fp16, without_timestamps=True, temperature=temperature)
+        retry = []
+        for batch_start in range(0, len(pending), batch_size):
+            indices = pending[batch_start:batch_start + batch_size]
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(torch.from_numpy(segments_audio[i])),
+                    n_mels=whisper_model.dims.n_mels,
+                )
+                for i in indices
+            ]).to(whisper_model.device)
+            results = whisper.decode(whisper_model, mels, options)
+            for i, result in zip(indices, results):
+                texts[i] = "" if is_silence(result) else result.text.strip()
+                if needs_fallback(result):
+                    retry.append(i)
+        if not retry:
+            break
+        pending = retry
+    return texts
+
+
+def decode_segments(whisper_model, segments_audio: list, batch_size: int) -> list:
+    """Decodes clips in-process, batched or one transcribe() call at a time."""
+    if batch_size > 1:
+        return decode_batched(whisper_model, segments_audio, batch_size)
+    return [
+        whisper_model.transcribe(segment_audio, fp16=get_device() == "cuda")['text'].strip()
+        for segment_audio in segments_audio
+    ]
+
+
+def load_segment_decoder():
+    """Returns the in-process Whisper model, or None when the worker pool decodes."""
+    if whisper_pool.enabled:
+        return None
+    return registry.get("whisper")
+
+
+def transcribe_segments(whisper_model, audio_waveform, merged_segments: list, batch_size: int = WHISPER_BATCH_SIZE) -> list:
+    """
+    Transcribes each diarized segment of a waveform.
+
+    Args:
+        whisper_model: A loaded Whisper model, or None to decode in the
+            Whisper worker pool (see load_segment_decoder()).
+        audio_waveform: The 16 kHz mono float32 waveform of the whole file.
+        merged_segments (list): Segments as dicts with 'start', 'end' and 'label' keys.
+        batch_size (int): Segments per batched decode; 1 decodes them one by one.
+
+    Returns:
+        list: A list of [start_time, end_time, speaker_id, text] segments.
+    """
+    sample_rate = TARGET_SAMPLE_RATE
+    segments_audio = []
+    for segment in merged_segments:
+        start_sample = int(segment['start'] * sample_rate)
+        end_sample = int(segment['end'] * sample_rate)
+        segments_audio.append(audio_waveform[start_sample:min(end_sample, len(audio_waveform))])
+
+    if whisper_model is None:
+        texts = whisper_pool.decode(segments_audio, batch_size)
+    else:
+        texts = decode_segments(whisper_model, segments_audio, batch_size)
+
+    final_output_list = []
+    for segment, text in zip(merged_segments, texts):
+        if text:
+            final_output_list.append([segment['start'], segment['end'], segment['label'], text])
+    return final_output_list
+
+
+def transcribe_with_diarization(audio_path: str) -> list:
+    """
+    Transcribes an audio file offline with pyannote diarization and Whisper.
+
+    Models come from the process-wide registry, so only the first call pays
+    for loading them. The file is decoded once; diarization and every
+    Whisper segment read from that single buffer. With SAGE_WHISPER_WORKERS
+    set on a CPU-only node, the segments are decoded across worker processes.
+
+    Args:
+        audio_path (str): The path to the audio file.
+
+    Returns:
+        list: A list of [start_time, end_time, speaker_id, text] segments.
+    """
+    return transcribe_waveform(load_audio(audio_path))
+
+
+def transcribe_waveform(audio_waveform) -> list:
+    """Diarizes and transcribes a 16 kHz mono float32 waveform; see transcribe_with_diarization()."""
+    merged_segments = diarize(audio_waveform)
+    if not merged_segments:
+        return []
+
+    whisper_model = load_segment_decoder()
+
+    start = time.perf_counter()
+    final_output_list = transcribe_segments(whisper_model, audio_waveform, merged_segments)
+    registry.record_inference("whisper", time.perf_counter() - start)
+
+    return final_output_list
+
+
+async def stream_with_diarization(audio_path: str, chunk_seconds: float):
+    """
+    Transcribes an audio file offline, yielding the transcript chunk by chunk.
+
+    Diarization runs over the whole file first so speaker labels stay
+    consistent; Whisper then decodes the segments of one chunk-length window
+    at a time, each in a worker thread.
+
+    Args:
+        audio_path (str): The path to the audio file.
+        chunk_seconds (float): Length of each window in seconds.
+
+    Yields:
+        list: The [start_time, end_time, speaker_id, text] segments of each window.
+    """
+    audio_waveform = await asyncio.to_thread(load_audio, audio_path)
+    async for segments in stream_waveform(audio_waveform, chunk_seconds):
+        yield segments
+
+
+async def stream_waveform(audio_waveform, chunk_seconds: float):
+    """Diarizes and transcribes a waveform window by window; see stream_with_diarization()."""
+    merged_segments = await asyncio.to_thread(diarize, audio_waveform)
+    if not merged_segments:
+        return
+
+    whisper_model = await asyncio.to_thread(load_segment_decoder)
+
+    windows = {}
+    for segment in merged_segments:
+        windows.setdefault(int(segment['start'] // chunk_seconds), []).append(segment)
+
+    for _, window_segments in sorted(windows.items()):
+        start = time.perf_counter()
+        segments = await asyncio.to_thread(transcribe_segments, whisper_model, audio_waveform, window_segments)
+        registry.record_inference("whisper", time.perf_counter() - start)
+        yield segments
@@ -0,0 +1,243 @@
+"""
+Shared local model server.
+
+One long-lived process holds the Whisper and pyannote models and serves
+transcription jobs from every SAGE process over a Unix socket, so memory does
+not grow with the number of Streamlit sessions and no session pays for
+loading the models. Audio is decoded by the client and handed over through
+shared memory; only the job description and the transcript go through the
+socket, as newline-delimited JSON.
+
+Start it from the sage directory:
+    python -m manager_agent.sub_agents.audio_to_transcript_agent.model_server
+and point SAGE processes at it with SAGE_MODEL_SERVER_SOCKET.
+"""
+import asyncio
+import json
+import os
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from dotenv import load_dotenv
+from .audio import load_audio, load_channels
+
+load_dotenv()
+
+# Unix socket of the shared model server. Empty runs the local models in-process.
+MODEL_SERVER_SOCKET = os.getenv("SAGE_MODEL_SERVER_SOCKET", "")
+DEFAULT_SOCKET = "/tmp/sage-model-server.sock"
+# Largest single message (one chunk of transcript) either side accepts.
+_LINE_LIMIT = 64 * 1024 * 1024
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to a client's shared memory block without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 every attached block is tracked and unlinked at exit.
+        block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+class ModelServer:
+    """
+    Serves local transcription jobs one at a time from warm models.
+
+    Jobs are queued on an asyncio lock, which wakes waiters in arrival order,
+    so concurrent sessions are served first come, first served while the
+    models stay in memory once.
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.queued = 0
+        self.running = False
+        self.jobs = 0
+        self._lock = asyncio.Lock()
+
+    async def warm(self) -> None:
+        """Loads every model before the first job arrives."""
+        from .local_backend import DIARIZATION_ENGINE, load_segment_decoder
+        from .models import registry
+
+        if DIARIZATION_ENGINE != "lite":
+            await asyncio.to_thread(registry.get, "diarization")
+        await asyncio.to_thread(registry.get, "whisper")
+        await asyncio.to_thread(load_segment_decoder)
+
+    def status(self) -> dict:
+        """Returns the queue depth, job count, model timings and the ids of the models served."""
+        from .local_backend import diarization_engine_id
+        from .models import registry, whisper_model_id
+
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "jobs": self.jobs,
+            "models": registry.stats(),
+            "engines": {"diarization": diarization_engine_id(), "whisper": whisper_model_id()},
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves one request: 'status', or 'transcribe' with the audio in shared memory."""
+        try:
+            request = json.loads(await reader.readline())
+            if request.get("op") == "status":
+                await _send(writer, self.status())
+            elif request.get("op") == "transcribe":
+                await self._transcribe(request, writer)
+            else:
+                await _send(writer, {"error": f"Unknown operation: {request.get('op')}"})
+        except Exception as e:
+            try:
+                await _send(writer, {"error": str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _transcribe(self, request: dict, writer: asyncio.StreamWriter) -> None:
+        from .local_backend import stream_waveform
+        from .stereo import transcribe_channels
+
+        block = _attach(request["shm"])
+        audio = None
+        try:
+            audio = np.ndarray(tuple(request["shape"]), dtype=np.float32, buffer=block.buf)
+            self.queued += 1
+            try:
+                await self._lock.acquire()
+            finally:
+                self.queued -= 1
+            try:
+                self.running = True
+                if audio.ndim == 2:
+                    transcript = await asyncio.to_thread(transcribe_channels, audio, request["speakers"])
+                    await _send(writer, {"segments": transcript})
+                else:
+                    async for segments in stream_waveform(audio, request["chunk_seconds"]):
+                        await _send(writer, {"segments": segments})
+                await _send(writer, {"done": True})
+            finally:
+                self.running = False
+                self.jobs += 1
+                self._lock.release()
+        finally:
+            del audio
+            block.close()
+
+    async def serve(self) -> None:
+        """Warms the models and serves requests until the process is stopped."""
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        await self.warm()
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path, limit=_LINE_LIMIT)
+        os.chmod(self.socket_path, 0o600)
+        print(f"SAGE model server listening on {self.socket_path}")
+        async with server:
+            await server.serve_forever()
+
+
+async def _request(audio: np.ndarray, request: dict, socket_path: str):
+    """Sends one job with `audio` in shared memory and yields each reply until 'done'."""
+    block = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+    try:
+        shared = np.ndarray(audio.shape, dtype=np.float32, buffer=block.buf)
+        shared[:] = audio
+        del shared
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=_LINE_LIMIT)
+        try:
+            await _send(writer, {**request, "shm": block.name, "shape": list(audio.shape)})
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise Exception("The model server closed the connection.")
+                message = json.loads(line)
+                if "error" in message:
+                    raise Exception(f"Model server error: {message['error']}")
+                if message.get("done"):
+                    return
+                yield message["segments"]
+        finally:
+            writer.close()
+    finally:
+        block.close()
+        block.unlink()
+
+
+async def stream_from_server(audio_path: str, chunk_seconds: float, socket_path: str = MODEL_SERVER_SOCKET):
+    """
+    Transcribes an audio file on the model server, window by window.
+
+    Args:
+        audio_path (str): The path to the audio file.
+        chunk_seconds (float): Length of each window in seconds.
+        socket_path (str): The server's Unix socket.
+
+    Yields:
+        list: The [start_time, end_time, speaker_id, text] segments of each window.
+    """
+    audio = await asyncio.to_thread(load_audio, audio_path)
+    async for segments in _request(audio, {"op": "transcribe", "chunk_seconds": chunk_seconds}, socket_path):
+        yield segments
+
+
+async def transcribe_on_server(audio_path: str, chunk_seconds: float, socket_path: str = MODEL_SERVER_SOCKET) -> list:
+    """Transcribes an audio file on the model server; see stream_from_server()."""
+    transcript = []
+    async for segments in stream_from_server(audio_path, chunk_seconds, socket_path):
+        transcript.extend(segments)
+    return transcript
+
+
+async def transcribe_stereo_on_server(audio_path: str, speakers: list, socket_path: str = MODEL_SERVER_SOCKET) -> list:
+    """Transcribes a dual-channel recording on the model server, one speaker per channel."""
+    channels = await asyncio.to_thread(load_channels, audio_path)
+    transcript = []
+    async for segments in _request(channels, {"op": "transcribe", "speakers": speakers}, socket_path):
+        transcript.extend(segments)
+    return transcript
+
+
+async def server_status(socket_path: str = MODEL_SERVER_SOCKET):
+    """Returns the server's status dict, or None if it is not reachable."""
+    try:
+        reader, writer = await asyncio.open_unix_connection(socket_path, limit=_LINE_LIMIT)
+    except (OSError, ValueError):
+        return None
+    try:
+        await _send(writer, {"op": "status"})
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+async def server_engines(socket_path: str = MODEL_SERVER_SOCKET) -> dict:
+    """
+    Returns the ids of the models the server transcribes with.
+
+    They describe the server's settings rather than this process's, and
+    asking for them does not import torch on the client.
+
+    Args:
+        socket_path (str): The server's Unix socket.
+
+    Returns:
+        dict: The 'diarization' and 'whisper' ids, as used in transcript cache keys.
+    """
+    status = await server_status(socket_path)
+    if status is None:
+        raise Exception(f"Model server not reachable at {socket_path}.")
+    if "engines" not in status:
+        raise Exception("The model server does not report its models; restart it with this version.")
+    return status["engines"]
+
+
+if __name__ == "__main__":
+    asyncio.run(ModelServer(MODEL_SERVER_SOCKET or DEFAULT_SOCKET).serve())
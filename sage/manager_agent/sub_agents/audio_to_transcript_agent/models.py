@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from functools import lru_cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HF_TOKEN = os.getenv('HF_TOKEN')
+# Seconds a model may stay unused before it is unloaded. 0 keeps models loaded for the life of the process.
+MODEL_IDLE_TIMEOUT = float(os.getenv("SAGE_MODEL_IDLE_TIMEOUT", "0"))
+# "float32" or "int8": dynamic int8 quantization of Whisper's linear layers for CPU-only workers.
+WHISPER_PRECISION = os.getenv("SAGE_WHISPER_PRECISION", "float32")
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of the local transcription models.
+
+    Each model is loaded once on first use and kept warm between calls. When
+    an idle timeout is set, models that have not been used for that long are
+    dropped so their memory can be reclaimed; the next call loads them again.
+    The registry also records how long loading and inference took per model.
+    """
+
+    def __init__(self, idle_timeout: float = MODEL_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._loaders = {}
+        self._models = {}
+        self._last_used = {}
+        self._stats = {}
+        self._lock = threading.RLock()
+        self._load_locks = {}
+        self._reaper = None
+
+    def register(self, name: str, loader) -> None:
+        """Registers a zero-argument loader for `name`."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks[name] = threading.Lock()
+            self._stats[name] = {
+                "loads": 0,
+                "load_seconds": 0.0,
+                "inference_calls": 0,
+                "inference_seconds": 0.0,
+            }
+
+    def get(self, name: str):
+        """Returns the model registered as `name`, loading it if needed."""
+        with self._load_locks[name]:
+            with self._lock:
+                model = self._models.get(name)
+            if model is None:
+                start = time.perf_counter()
+                model = self._loaders[name]()
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._models[name] = model
+                    self._stats[name]["loads"] += 1
+                    self._stats[name]["load_seconds"] += elapsed
+                print(f"Loaded {name} in {elapsed:.2f}s")
+        with self._lock:
+            self._last_used[name] = time.monotonic()
+        self._schedule_reaper()
+        return model
+
+    def record_inference(self, name: str, seconds: float) -> None:
+        """Adds one inference call of `seconds` to the stats of `name`."""
+        with self._lock:
+            self._stats[name]["inference_calls"] += 1
+            self._stats[name]["inference_seconds"] += seconds
+
+    def evict(self, name: str) -> None:
+        """Unloads `name` if it is loaded."""
+        with self._lock:
+            self._models.pop(name, None)
+            self._last_used.pop(name, None)
+        if get_device() == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+
+    def evict_idle(self) -> list:
+        """Unloads every model idle for longer than the timeout and returns their names."""
+        if not self.idle_timeout:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                name for name, last_used in self._last_used.items()
+                if now - last_used >= self.idle_timeout
+            ]
+        for name in idle:
+            self.evict(name)
+            print(f"Evicted idle model {name}")
+        return idle
+
+    def stats(self) -> dict:
+        """Returns load and inference timings per model."""
+        with self._lock:
+            return {
+                name: {**stats, "loaded": name in self._models}
+                for name, stats in self._stats.items()
+            }
+
+    def _schedule_reaper(self) -> None:
+        if not self.idle_timeout:
+            return
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Timer(self.idle_timeout, self._reap)
+            self._reaper.daemon = True
+            self._reaper.start()
+
+    def _reap(self) -> None:
+        self.evict_idle()
+        with self._lock:
+            self._reaper = None
+            pending = bool(self._models)
+        if pending:
+            self._schedule_reaper()
+
+
+@lru_cache(maxsize=None)
+def get_device() -> str:
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_diarization_pipeline():
+    import torch
+    from pyannote.audio import Pipeline
+
+    pipeline = Pipeline.from_pretrained(
+        "pyannote/speaker-diarization-3.1",
+        use_auth_token=HF_TOKEN
+    )
+    pipeline.to(torch.device(get_device()))
+    return pipeline
+
+
+def whisper_precision() -> str:
+    """Returns the precision Whisper actually runs at; int8 only applies on CPU."""
+    if WHISPER_PRECISION == "int8" and get_device() == "cpu":
+        return "int8"
+    return "float16" if get_device() == "cuda" else "float32"
+
+
+def whisper_model_id() -> str:
+    """Names the Whisper model and its precision, for cache keys."""
+    return "whisper-base-int8" if whisper_precision() == "int8" else "whisper-base"
+
+
+def quantize_whisper_int8(whisper_model):
+    """
+    Applies dynamic int8 quantization to the linear layers of a CPU Whisper model.
+
+    Weights are stored as int8 and activations are quantized on the fly, which
+    speeds up the attention and MLP matmuls that dominate CPU decoding.
+    Whisper wraps nn.Linear in a subclass that only casts weights to the input
+    dtype; on CPU in float32 that cast is a no-op, so those layers are turned
+    back into plain nn.Linear for the quantizer to pick them up.
+
+    Args:
+        whisper_model: A Whisper model loaded on CPU.
+
+    Returns:
+        The quantized model.
+    """
+    import torch
+    import whisper
+
+    for module in whisper_model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(whisper_model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_whisper_model(precision: str = None):
+    import whisper
+
+    precision = precision or whisper_precision()
+    whisper_model = whisper.load_model("base", device=get_device())
+    if precision == "int8":
+        whisper_model = quantize_whisper_int8(whisper_model)
+    return whisper_model
+
+
+registry = ModelRegistry()
+registry.register("diarization", load_diarization_pipeline)
+registry.register("whisper", load_whisper_model)
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import wave
+from functools import lru_cache
+from dotenv import load_dotenv
+from .chunking import plan_silence_chunks, read_wav_chunk, reconcile_chunk, wav_duration
+from .ingest import transcode_for_upload
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# Nominal chunk length and overlap for chunked and streamed transcription, and concurrent chunk requests.
+CHUNK_SECONDS = float(os.getenv("SAGE_TRANSCRIBE_CHUNK_SECONDS", "120"))
+CHUNK_MARGIN = float(os.getenv("SAGE_TRANSCRIBE_CHUNK_MARGIN", "3"))
+# The margin is extended until it holds this many seconds of speech, so speakers can be matched.
+CHUNK_MARGIN_SPEECH = float(os.getenv("SAGE_TRANSCRIBE_CHUNK_MARGIN_SPEECH", "5"))
+TRANSCRIBE_CONCURRENCY = int(os.getenv("SAGE_TRANSCRIBE_CONCURRENCY", "6"))
+
+
+@lru_cache(maxsize=None)
+def openai_client():
+    """Returns a shared AsyncOpenAI client, importing the SDK on first use."""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+
+async def request_diarized_transcript(client, audio_file) -> list:
+    """Sends one diarized transcription request and returns its segments."""
+    transcript = await client.audio.transcriptions.create(
+        model="gpt-4o-transcribe-diarize",
+        file=audio_file,
+        response_format="diarized_json",
+        chunking_strategy="auto",
+    )
+    return [
+        [segment.start, segment.end, segment.speaker, segment.text.strip()]
+        for segment in transcript.segments
+    ]
+
+
+async def transcribe_openai(audio_filepath: str) -> list:
+    """
+    Transcribes an audio file with speaker diarization using the OpenAI API.
+
+    WAV recordings longer than one chunk are split at silences and the chunks
+    are transcribed concurrently; anything else is re-encoded to compact
+    16 kHz mono and sent in a single request.
+
+    Args:
+        audio_filepath (str): The path to the audio file.
+
+    Returns:
+        list: A list of [start_time, end_time, speaker_id, text] segments.
+    """
+    if not OPENAI_API_KEY:
+        raise Exception("OPENAI_API_KEY not found in environment.")
+
+    try:
+        duration = await asyncio.to_thread(wav_duration, audio_filepath)
+    except (wave.Error, EOFError):
+        duration = None
+
+    if duration is not None and duration > CHUNK_SECONDS:
+        transcript = []
+        async for segments in stream_openai(audio_filepath):
+            transcript.extend(segments)
+        return transcript
+
+    client = openai_client()
+    upload = await asyncio.to_thread(transcode_for_upload, audio_filepath)
+    return await request_diarized_transcript(client, upload)
+
+
+async def stream_openai(audio_filepath: str, chunk_seconds: float = CHUNK_SECONDS):
+    """
+    Transcribes a WAV file in chunks with concurrent OpenAI requests.
+
+    Chunk boundaries are placed at silences and every chunk re-reads at least
+    CHUNK_MARGIN seconds of the previous one, extended to hold
+    CHUNK_MARGIN_SPEECH seconds of speech, so speaker labels can be carried
+    across boundaries. Up to TRANSCRIBE_CONCURRENCY requests are in flight;
+    chunks are reconciled and yielded in timeline order as soon as they and
+    every earlier chunk are done.
+
+    Args:
+        audio_filepath (str): The path to the WAV file.
+        chunk_seconds (float): Nominal length of each chunk in seconds.
+
+    Yields:
+        list: The [start_time, end_time, speaker_id, text] segments of each
+            chunk, on the timeline of the whole file.
+    """
+    if not OPENAI_API_KEY:
+        raise Exception("OPENAI_API_KEY not found in environment.")
+
+    client = openai_client()
+    chunks = await asyncio.to_thread(
+        plan_silence_chunks, audio_filepath, chunk_seconds, CHUNK_MARGIN, CHUNK_MARGIN_SPEECH
+    )
+    semaphore = asyncio.Semaphore(TRANSCRIBE_CONCURRENCY)
+
+    async def transcribe_chunk(read_start, end):
+        async with semaphore:
+            data = await asyncio.to_thread(read_wav_chunk, audio_filepath, read_start, end)
+            segments = await request_diarized_transcript(client, ("chunk.wav", data))
+        return [
+            [start + read_start, stop + read_start, speaker, text]
+            for start, stop, speaker, text in segments
+        ]
+
+    tasks = [asyncio.create_task(transcribe_chunk(read_start, end)) for read_start, _, end in chunks]
+    transcript = []
+    mapping = None
+    try:
+        for (read_start, boundary, _), task in zip(chunks, tasks):
+            segments, mapping = reconcile_chunk(transcript, await task, read_start, boundary, mapping)
+            transcript.extend(segments)
+            yield segments
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+import numpy as np
+from .audio import TARGET_SAMPLE_RATE, encode_wav, load_channels, memmap_wav, resample, to_float32
+from .chunking import ENERGY_FRAME_SECONDS, plan_boundaries, signal_energy
+from .models import get_device, registry
+from .openai_backend import openai_client
+
+# Seconds of one channel converted to float at a time when measuring its loudness.
+_ENERGY_BLOCK_SECONDS = 60
+
+
+def interleave(channel_segments: list, speakers: list) -> list:
+    """
+    Merges per-channel transcripts into one diarized transcript.
+
+    Args:
+        channel_segments (list): For each channel, its [start, end, text] segments.
+        speakers (list): The speaker label of each channel.
+
+    Returns:
+        list: [start_time, end_time, speaker_id, text] segments sorted by start time.
+    """
+    transcript = [
+        [start, end, speakers[channel], text]
+        for channel, segments in enumerate(channel_segments)
+        for start, end, text in segments
+        if text
+    ]
+    transcript.sort(key=lambda segment: segment[0])
+    return transcript
+
+
+async def request_timestamped_transcript(client, audio_file) -> list:
+    """Sends one single-speaker transcription request and returns its [start, end, text] segments."""
+    transcript = await client.audio.transcriptions.create(
+        model="whisper-1",
+        file=audio_file,
+        response_format="verbose_json",
+        timestamp_granularities=["segment"],
+    )
+    return [
+        [segment.start, segment.end, segment.text.strip()]
+        for segment in transcript.segments
+    ]
+
+
+def channel_energy(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    Computes the RMS loudness of one memory-mapped channel, a block at a time.
+
+    Args:
+        samples (np.ndarray): Raw samples of one channel, e.g. a column of memmap_wav().
+        sample_rate (int): The sample rate of the channel.
+
+    Returns:
+        np.ndarray: One RMS value per ENERGY_FRAME_SECONDS frame.
+    """
+    frame_length = max(1, int(ENERGY_FRAME_SECONDS * sample_rate))
+    block_length = frame_length * max(1, int(_ENERGY_BLOCK_SECONDS / ENERGY_FRAME_SECONDS))
+    blocks = [
+        signal_energy(to_float32(samples[start:start + block_length]), sample_rate)
+        for start in range(0, len(samples), block_length)
+    ]
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+
+
+def encode_channel_chunk(samples: np.ndarray, sample_rate: int, start: float, end: float) -> bytes:
+    """Converts [start, end] seconds of one memory-mapped channel into 16 kHz mono WAV bytes."""
+    chunk = to_float32(samples[int(start * sample_rate):int(end * sample_rate)])
+    return encode_wav(resample(chunk, sample_rate, TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE)
+
+
+async def transcribe_channel_openai(client, samples, sample_rate, chunk_seconds, margin, semaphore) -> list:
+    """
+    Transcribes one channel with the OpenAI API, in concurrent silence-aligned chunks.
+
+    Only the chunk being sent is decoded and resampled; the rest of the
+    channel stays in the memory-mapped file.
+
+    Returns:
+        list: The channel's [start, end, text] segments on the file timeline.
+    """
+    duration = len(samples) / sample_rate
+    energy = await asyncio.to_thread(channel_energy, samples, sample_rate)
+    chunks = plan_boundaries(energy, duration, chunk_seconds, margin)
+
+    async def transcribe_chunk(read_start, boundary, end):
+        async with semaphore:
+            data = await asyncio.to_thread(encode_channel_chunk, samples, sample_rate, read_start, end)
+            segments = await request_timestamped_transcript(client, ("channel.wav", data))
+        shifted = [[start + read_start, stop + read_start, text] for start, stop, text in segments]
+        return [segment for segment in shifted if (segment[0] + segment[1]) / 2 >= boundary]
+
+    results = await asyncio.gather(*(transcribe_chunk(*chunk) for chunk in chunks))
+    return [segment for segments in results for segment in segments]
+
+
+async def transcribe_stereo_openai(audio_path: str, speakers: list, chunk_seconds: float,
+                                   margin: float, concurrency: int) -> list:
+    """
+    Transcribes a dual-channel recording without diarization, using the OpenAI API.
+
+    Both channels are transcribed concurrently with a single-speaker model and
+    their segments are interleaved with the channel's speaker label.
+
+    Args:
+        audio_path (str): The path to the stereo WAV file.
+        speakers (list): The speaker label of each channel.
+        chunk_seconds (float): Nominal chunk length for long channels.
+        margin (float): Overlap between consecutive chunks.
+        concurrency (int): Maximum requests in flight across both channels.
+
+    Returns:
+        list: A list of [start_time, end_time, speaker_id, text] segments.
+    """
+    samples, sample_rate = memmap_wav(audio_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    channel_segments = await asyncio.gather(*(
+        transcribe_channel_openai(openai_client(), samples[:, channel], sample_rate, chunk_seconds, margin, semaphore)
+        for channel in range(2)
+    ))
+    return interleave(channel_segments, speakers)
+
+
+def transcribe_stereo_local(audio_path: str, speakers: list) -> list:
+    """
+    Transcribes a dual-channel recording offline with Whisper, skipping pyannote.
+
+    Args:
+        audio_path (str): The path to the stereo WAV file.
+        speakers (list): The speaker label of each channel.
+
+    Returns:
+        list: A list of [start_time, end_time, speaker_id, text] segments.
+    """
+    return transcribe_channels(load_channels(audio_path), speakers)
+
+
+def transcribe_channels(channels: np.ndarray, speakers: list) -> list:
+    """
+    Transcribes 16 kHz channels, one speaker each, and interleaves them.
+
+    The channels share the warm Whisper model from the registry, whose decoding
+    state is not safe to use from two threads at once, so they are decoded one
+    after the other.
+
+    Args:
+        channels (np.ndarray): 16 kHz float32 samples of shape (channels, samples).
+        speakers (list): The speaker label of each channel.
+
+    Returns:
+        list: A list of [start_time, end_time, speaker_id, text] segments.
+    """
+    whisper_model = registry.get("whisper")
+
+    channel_segments = []
+    for audio in channels:
+        start = time.perf_counter()
+        result = whisper_model.transcribe(audio, fp16=get_device() == "cuda")
+        registry.record_inference("whisper", time.perf_counter() - start)
+        channel_segments.append([
+            [segment['start'], segment['end'], segment['text'].strip()]
+            for segment in result['segments']
+        ])
+    return interleave(channel_segments, speakers)
@@ -0,0 +1,102 @@
+import os
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Same-speaker turns closer than this many seconds are joined.
+TURN_MERGE_GAP = float(os.getenv("SAGE_TURN_MERGE_GAP", "0.1"))
+# Turns shorter than this after merging are dropped instead of being sent to Whisper.
+TURN_MIN_DURATION = float(os.getenv("SAGE_TURN_MIN_DURATION", "0.3"))
+# "split" cuts partially overlapping turns at the middle of the overlap and drops turns
+# fully inside another speaker's turn; "keep" leaves overlapping turns as they are.
+TURN_OVERLAP = os.getenv("SAGE_TURN_OVERLAP", "split")
+
+
+def merge_same_speaker(starts: np.ndarray, ends: np.ndarray, codes: np.ndarray, gap: float) -> tuple:
+    """
+    Joins runs of consecutive turns by the same speaker separated by less than `gap`.
+
+    Args:
+        starts (np.ndarray): Turn start times, sorted.
+        ends (np.ndarray): Turn end times.
+        codes (np.ndarray): Integer speaker code of each turn.
+        gap (float): Largest silence, in seconds, bridged within a run.
+
+    Returns:
+        tuple: (starts, ends, codes) of the merged turns.
+    """
+    if len(starts) == 0:
+        return starts, ends, codes
+    new_run = np.ones(len(starts), dtype=bool)
+    new_run[1:] = (codes[1:] != codes[:-1]) | (starts[1:] - ends[:-1] >= gap)
+    first = np.flatnonzero(new_run)
+    return starts[first], np.maximum.reduceat(ends, first), codes[first]
+
+
+def resolve_overlaps(starts: np.ndarray, ends: np.ndarray, codes: np.ndarray) -> tuple:
+    """
+    Removes overlapping speech so no audio is transcribed twice.
+
+    A turn that lies entirely inside another turn (a backchannel such as
+    "mm-hmm" over the other speaker) is dropped. Turns are ordered by start
+    and, for equal starts, longest first, so a turn is contained exactly when
+    it ends no later than some turn before it. Remaining neighbours that
+    still overlap are cut at the middle of the overlap.
+
+    Returns:
+        tuple: (starts, ends, codes) without overlaps, in timeline order.
+    """
+    if len(starts) < 2:
+        return starts, ends, codes
+    order = np.lexsort((-ends, starts))
+    starts, ends, codes = starts[order], ends[order], codes[order]
+    contained = np.zeros(len(starts), dtype=bool)
+    contained[1:] = ends[1:] <= np.maximum.accumulate(ends)[:-1]
+    starts, ends, codes = starts[~contained], ends[~contained].copy(), codes[~contained]
+
+    overlap = starts[1:] < ends[:-1]
+    middle = (starts[1:] + ends[:-1]) / 2
+    starts = starts.copy()
+    starts[1:] = np.where(overlap, middle, starts[1:])
+    ends[:-1] = np.where(overlap, middle, ends[:-1])
+    return starts, ends, codes
+
+
+def merge_turns(segments: list, gap: float = TURN_MERGE_GAP, min_duration: float = TURN_MIN_DURATION,
+                overlap: str = TURN_OVERLAP) -> list:
+    """
+    Cleans up diarization turns before they are transcribed.
+
+    Turns are sorted, same-speaker neighbours are merged across short gaps,
+    overlaps are resolved, fragments shorter than `min_duration` are dropped,
+    and the turns that become neighbours are merged again. All steps work on
+    NumPy arrays.
+
+    Args:
+        segments (list): Turns as dicts with 'start', 'end' and 'label' keys.
+        gap (float): Largest same-speaker gap, in seconds, that is bridged.
+        min_duration (float): Shortest turn kept, in seconds.
+        overlap (str): "split" to resolve overlapping speech, "keep" to leave it.
+
+    Returns:
+        list: Merged turns as dicts with 'start', 'end' and 'label' keys.
+    """
+    if not segments:
+        return []
+    starts = np.array([segment['start'] for segment in segments], dtype=np.float64)
+    ends = np.array([segment['end'] for segment in segments], dtype=np.float64)
+    labels, codes = np.unique([segment['label'] for segment in segments], return_inverse=True)
+
+    # By start, longest first among equal starts.
+    order = np.lexsort((-ends, starts))
+    starts, ends, codes = merge_same_speaker(starts[order], ends[order], codes[order], gap)
+    if overlap == "split":
+        starts, ends, codes = resolve_overlaps(starts, ends, codes)
+    keep = ends - starts >= min_duration
+    starts, ends, codes = merge_same_speaker(starts[keep], ends[keep], codes[keep], gap)
+
+    return [
+        {'start': float(start), 'end': float(end), 'label': str(labels[code])}
+        for start, end, code in zip(starts, ends, codes)
+    ]
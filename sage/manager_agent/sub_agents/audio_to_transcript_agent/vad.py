@@ -0,0 +1,209 @@
+import os
+import struct
+import tempfile
+import wave
+import numpy as np
+from .audio import TARGET_SAMPLE_RATE, memmap_wav, resample, to_float32, to_mono_float32
+from .chunking import signal_energy
+
+# Length of the frames whose loudness decides speech / non-speech.
+VAD_FRAME_SECONDS = 0.03
+# Silence inserted between speech regions in the trimmed audio.
+JOIN_SILENCE_SECONDS = 0.5
+
+_SPEECH_ABOVE_FLOOR_DB = 10.0
+_MIN_SPEECH_DB = -55.0
+_MERGE_GAP_SECONDS = 0.5
+_PAD_SECONDS = 0.25
+_MIN_REGION_SECONDS = 0.3
+_MUSIC_WINDOW_SECONDS = 5.0
+_MUSIC_DIP_DB = 10.0
+_MUSIC_MAX_DIP_RATIO = 0.1
+_MUSIC_MIN_WINDOWS = 3
+
+
+def frame_levels(waveform: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Returns the loudness of consecutive VAD_FRAME_SECONDS frames in dBFS."""
+    energy = signal_energy(waveform, sample_rate, VAD_FRAME_SECONDS)
+    return 20 * np.log10(np.maximum(energy, 1e-6))
+
+
+def music_frames(levels: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """
+    Flags loud stretches without speech rhythm, such as hold music.
+
+    Speech keeps dipping between syllables and words, while music and tones
+    hold a steady level. A window is music-like when it is fully active and
+    less than _MUSIC_MAX_DIP_RATIO of its frames fall _MUSIC_DIP_DB below its
+    loud level; only runs of at least _MUSIC_MIN_WINDOWS such windows are
+    flagged, so a burst of fast speech is never dropped.
+
+    Args:
+        levels (np.ndarray): Frame loudness in dBFS.
+        active (np.ndarray): Frames above the speech threshold.
+
+    Returns:
+        np.ndarray: Boolean mask of frames to drop as music.
+    """
+    window = int(_MUSIC_WINDOW_SECONDS / VAD_FRAME_SECONDS)
+    count = len(levels) // window
+    mask = np.zeros(len(levels), dtype=bool)
+    if count == 0:
+        return mask
+
+    windows = levels[:count * window].reshape(count, window)
+    loud = np.percentile(windows, 90, axis=1, keepdims=True)
+    dip_ratio = (windows < loud - _MUSIC_DIP_DB).mean(axis=1)
+    steady = (dip_ratio < _MUSIC_MAX_DIP_RATIO) & active[:count * window].reshape(count, window).all(axis=1)
+
+    run_start = None
+    for index, is_music in enumerate(np.append(steady, False)):
+        if is_music and run_start is None:
+            run_start = index
+        elif not is_music and run_start is not None:
+            if index - run_start >= _MUSIC_MIN_WINDOWS:
+                mask[run_start * window:index * window] = True
+            run_start = None
+    return mask
+
+
+def detect_speech(waveform: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> list:
+    """
+    Finds the speech regions of a mono signal.
+
+    Frames more than _SPEECH_ABOVE_FLOOR_DB above the recording's noise floor
+    count as active, hold music is removed with music_frames(), and the
+    remaining frames are merged across short pauses and padded so word edges
+    are kept.
+
+    Args:
+        waveform (np.ndarray): The mono float32 signal.
+        sample_rate (int): Its sample rate.
+
+    Returns:
+        list: [start, end] speech regions in seconds, in order.
+    """
+    levels = frame_levels(waveform, sample_rate)
+    if len(levels) == 0:
+        return []
+    floor = np.percentile(levels, 10)
+    active = levels > max(floor + _SPEECH_ABOVE_FLOOR_DB, _MIN_SPEECH_DB)
+    speech = active & ~music_frames(levels, active)
+
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = (np.flatnonzero(edges == 1) * VAD_FRAME_SECONDS).tolist()
+    ends = (np.flatnonzero(edges == -1) * VAD_FRAME_SECONDS).tolist()
+    duration = len(waveform) / sample_rate
+
+    regions = []
+    for start, end in zip(starts, ends):
+        start, end = max(0.0, start - _PAD_SECONDS), min(duration, end + _PAD_SECONDS)
+        if regions and start - regions[-1][1] < _MERGE_GAP_SECONDS:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    return [region for region in regions if region[1] - region[0] >= _MIN_REGION_SECONDS]
+
+
+def speech_timeline(regions: list, join_silence: float = JOIN_SILENCE_SECONDS) -> list:
+    """Lays speech regions end to end: returns (start, end, trimmed_start) per region."""
+    timeline = []
+    position = 0.0
+    for start, end in regions:
+        timeline.append((start, end, position))
+        position += end - start + join_silence
+    return timeline
+
+
+def to_original_time(timeline: list, seconds: float) -> float:
+    """Maps a time in the trimmed audio back to the original recording."""
+    trimmed_starts = [trimmed_start for _, _, trimmed_start in timeline]
+    index = max(0, int(np.searchsorted(trimmed_starts, seconds, side="right")) - 1)
+    start, end, trimmed_start = timeline[index]
+    return min(start + max(0.0, seconds - trimmed_start), end)
+
+
+def map_transcript(transcript: list, timeline: list) -> list:
+    """Moves [start, end, speaker, text] segments from the trimmed audio to the original timeline."""
+    return [
+        [to_original_time(timeline, start), to_original_time(timeline, end), *rest]
+        for start, end, *rest in transcript
+    ]
+
+
+def skip_report(duration: float, regions: list) -> dict:
+    """Summarizes how much audio the VAD stage kept and skipped."""
+    speech = sum(end - start for start, end in regions)
+    return {
+        "duration_seconds": round(duration, 2),
+        "speech_seconds": round(speech, 2),
+        "skipped_seconds": round(duration - speech, 2),
+        "skipped_ratio": round((duration - speech) / duration, 3) if duration else 0.0,
+        "speech_regions": len(regions),
+    }
+
+
+def write_trimmed_wav(audio_path: str, regions: list, join_silence: float = JOIN_SILENCE_SECONDS) -> str:
+    """
+    Writes the speech regions of a WAV file, end to end, to a temporary 16 kHz WAV.
+
+    Channels are kept, so dual-channel recordings stay dual-channel.
+
+    Args:
+        audio_path (str): The path to the WAV file.
+        regions (list): [start, end] speech regions in seconds.
+        join_silence (float): Silence inserted between regions.
+
+    Returns:
+        str: The path of the temporary file; the caller removes it.
+    """
+    samples, sample_rate = memmap_wav(audio_path)
+    gap = np.zeros((int(join_silence * TARGET_SAMPLE_RATE), samples.shape[1]), dtype=np.float32)
+    pieces = []
+    for start, end in regions:
+        raw = samples[int(start * sample_rate):int(end * sample_rate)]
+        pieces.append(np.stack(
+            [resample(to_float32(raw[:, channel]), sample_rate, TARGET_SAMPLE_RATE) for channel in range(raw.shape[1])],
+            axis=1,
+        ))
+        pieces.append(gap)
+    trimmed = np.concatenate(pieces[:-1]) if pieces else gap
+    pcm = (np.clip(trimmed, -1.0, 1.0) * 32767).astype(np.int16)
+
+    handle, trimmed_path = tempfile.mkstemp(suffix=".wav")
+    os.close(handle)
+    with wave.open(trimmed_path, "wb") as out:
+        out.setnchannels(pcm.shape[1])
+        out.setsampwidth(2)
+        out.setframerate(TARGET_SAMPLE_RATE)
+        out.writeframes(pcm.tobytes())
+    return trimmed_path
+
+
+def trim_silence(audio_path: str, min_skip_seconds: float) -> tuple:
+    """
+    Runs the VAD stage on a WAV file and writes its speech-only version.
+
+    Nothing is trimmed when the file is not a WAV file, when no speech is
+    found, or when less than `min_skip_seconds` would be skipped, since the
+    saving would not pay for the extra pass.
+
+    Args:
+        audio_path (str): The path to the audio file.
+        min_skip_seconds (float): Smallest amount of skipped audio worth trimming.
+
+    Returns:
+        tuple: (trimmed WAV path or None, timeline for map_transcript(), skip report).
+    """
+    try:
+        samples, sample_rate = memmap_wav(audio_path)
+    except (wave.Error, struct.error):
+        return None, [], {}
+
+    waveform = resample(to_mono_float32(samples), sample_rate, TARGET_SAMPLE_RATE)
+    regions = detect_speech(waveform)
+    report = skip_report(len(samples) / sample_rate, regions)
+    report["trimmed"] = bool(regions) and report["skipped_seconds"] >= min_skip_seconds
+    if not report["trimmed"]:
+        return None, [], report
+    return write_trimmed_wav(audio_path, regions), speech_timeline(regions), report
@@ -0,0 +1,125 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from .models import get_device, load_whisper_model
+
+load_dotenv()
+
+# Worker processes decoding Whisper segments on CPU. 0 or 1 decodes in the calling process.
+WHISPER_WORKERS = int(os.getenv("SAGE_WHISPER_WORKERS", "0"))
+
+_worker_model = None
+
+
+def _init_worker(threads: int) -> None:
+    """Pins the worker's torch thread count and loads its own Whisper model."""
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(threads)
+    _worker_model = load_whisper_model()
+
+
+def _decode_shard(segments_audio: list, batch_size: int) -> list:
+    """Decodes one shard of clips with the worker's warm model."""
+    from .local_backend import decode_segments
+
+    return decode_segments(_worker_model, segments_audio, batch_size)
+
+
+def plan_shards(segments_audio: list, shard_count: int) -> list:
+    """
+    Splits clips into shards of similar total length.
+
+    Clips are dealt longest first to the shard with the least audio so far,
+    so one worker is not left decoding the long turns alone.
+
+    Args:
+        segments_audio (list): The clips to decode.
+        shard_count (int): Number of shards to build.
+
+    Returns:
+        list: Non-empty lists of clip indices, each in ascending order.
+    """
+    shards = [[] for _ in range(shard_count)]
+    loads = [0] * shard_count
+    for index in sorted(range(len(segments_audio)), key=lambda i: -len(segments_audio[i])):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(index)
+        loads[lightest] += len(segments_audio[index])
+    return [sorted(shard) for shard in shards if shard]
+
+
+class WhisperPool:
+    """
+    Pool of worker processes, each holding a warm CPU Whisper model.
+
+    PyTorch decoding of one segment uses a single core for most of its time,
+    so on CPU-only nodes the merged diarization segments are spread across
+    processes instead. Each worker gets an equal share of the cores for its
+    intra-op threads. The pool starts on first use, is reused across calls
+    and is shut down when the process exits.
+    """
+
+    def __init__(self, workers: int = WHISPER_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """True when segments should be decoded in the pool rather than in-process."""
+        return self.workers > 1 and get_device() == "cpu"
+
+    def start(self) -> ProcessPoolExecutor:
+        """Starts the worker processes if they are not running yet."""
+        with self._lock:
+            if self._executor is None:
+                threads = max(1, (os.cpu_count() or 1) // self.workers)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(threads,),
+                )
+                print(f"Started {self.workers} Whisper workers with {threads} threads each")
+            return self._executor
+
+    def decode(self, segments_audio: list, batch_size: int) -> list:
+        """
+        Decodes clips across the worker processes.
+
+        Args:
+            segments_audio (list): 16 kHz float32 waveforms.
+            batch_size (int): Clips per forward pass inside each worker.
+
+        Returns:
+            list: The decoded text of each clip, in input order.
+        """
+        if not segments_audio:
+            return []
+        executor = self.start()
+        shards = plan_shards(segments_audio, self.workers)
+        futures = [
+            executor.submit(_decode_shard, [segments_audio[i] for i in shard], batch_size)
+            for shard in shards
+        ]
+        texts = [""] * len(segments_audio)
+        for shard, future in zip(shards, futures):
+            for index, text in zip(shard, future.result()):
+                texts[index] = text
+        return texts
+
+    def shutdown(self) -> None:
+        """Stops the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+whisper_pool = WhisperPool()
+atexit.register(whisper_pool.shutdown)
@@ -0,0 +1,3 @@
+from .agent import fast_analysis_agent
+
+__all__ = ["fast_analysis_agent"]
\ No newline at end of file
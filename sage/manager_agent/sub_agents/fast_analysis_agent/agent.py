@@ -0,0 +1,179 @@
+from google.adk.agents import Agent
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.tools.tool_context import ToolContext
+import math
+import os
+from litellm import acompletion
+from dotenv import load_dotenv
+from ..intent_agent.agent import INTENT_CATEGORIES
+from ..prompt_context import build_prompt, record_usage
+from ..sentiment_agent.agent import safe_parse_json, summarize_timeline
+load_dotenv()
+
+# Minutes per sentiment window in fast mode, coarser than the full pipeline's 1-minute buckets.
+FAST_SENTIMENT_WINDOW_MINUTES = int(os.getenv("SAGE_FAST_SENTIMENT_WINDOW_MINUTES", "5"))
+
+SENTIMENT_LABELS = ["Anger", "Frustration", "Calm", "Apology", "Satisfaction"]
+
+FAST_ANALYSIS_INSTRUCTION = """You are an expert in analyzing banking call transcripts. Analyze the call above in a single pass.
+
+    1. intent: the customer's primary intent, exactly one of: {categories}.
+    2. root_cause: a concise summary of the underlying problem behind the call.
+    3. sentiment: for every time window listed below, the dominant emotion of the conversation in that window,
+       one of Anger (aggressive, raised voice), Frustration (annoyed or impatient tone), Calm (neutral or polite tone),
+       Apology (expressing regret) or Satisfaction (happy or thankful tone), with a confidence score between 0 and 1.
+
+    Time windows:
+    {windows}
+
+    Respond only with JSON matching the given schema.
+    """
+
+
+def sentiment_windows(transcript: list, window_minutes: int) -> list:
+    """
+    Splits the call into fixed windows and counts the segments starting in each.
+
+    Args:
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+        window_minutes (int): Length of a window in minutes.
+
+    Returns:
+        list: (first_minute, end_minute, message_count) for every window up to
+            the last segment, in order.
+    """
+    counts = {}
+    for start_t, _, _, _ in transcript:
+        window = int(math.floor(start_t / 60 / window_minutes))
+        counts[window] = counts.get(window, 0) + 1
+    return [
+        (window * window_minutes, (window + 1) * window_minutes, counts.get(window, 0))
+        for window in range(max(counts) + 1 if counts else 0)
+    ]
+
+
+def analysis_schema() -> dict:
+    """Returns the JSON schema of the combined analysis reply."""
+    return {
+        "type": "object",
+        "properties": {
+            "intent": {"type": "string", "enum": INTENT_CATEGORIES},
+            "root_cause": {"type": "string"},
+            "sentiment": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "window": {"type": "integer"},
+                        "label": {"type": "string", "enum": SENTIMENT_LABELS},
+                        "score": {"type": "number"},
+                    },
+                    "required": ["window", "label", "score"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["intent", "root_cause", "sentiment"],
+        "additionalProperties": False,
+    }
+
+
+async def analyze_call(transcript: list, usage: dict = None, window_minutes: int = None) -> tuple:
+    """
+    Classifies intent, root cause and a coarse sentiment timeline with one structured-output call.
+
+    The results have the same shape as classify_intent, find_root_cause and
+    score_sentiment, so they fill the same state keys. Windows missing from
+    the reply are scored neutral, like a failed minute in the full pipeline.
+
+    Args:
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+        usage (dict): Optional token counts, updated under 'fast_analysis'.
+        window_minutes (int): Minutes per sentiment window. Defaults to
+            SAGE_FAST_SENTIMENT_WINDOW_MINUTES.
+
+    Returns:
+        tuple: (intent, root_cause, sentiment) results.
+    """
+    window_minutes = window_minutes or FAST_SENTIMENT_WINDOW_MINUTES
+    windows = sentiment_windows(transcript, window_minutes)
+    task = FAST_ANALYSIS_INSTRUCTION.format(
+        categories=", ".join(INTENT_CATEGORIES),
+        windows="\n    ".join(
+            f"Window {index}: minute {first} to {end}"
+            for index, (first, end, count) in enumerate(windows)
+            if count
+        ),
+    )
+
+    resp = await acompletion(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": build_prompt(transcript, task)}],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "call_analysis", "strict": True, "schema": analysis_schema()},
+        },
+    )
+    record_usage(usage, "fast_analysis", resp)
+    parsed = safe_parse_json(resp["choices"][0]["message"]["content"]) or {}
+
+    intent = parsed.get("intent")
+    if intent not in INTENT_CATEGORIES:
+        intent = "GeneralInquiry"
+    root_cause = {"root_cause": parsed.get("root_cause", "")}
+
+    scores = {}
+    for item in parsed.get("sentiment", []):
+        try:
+            scores[int(item["window"])] = (item["label"], float(item["score"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    timeline = []
+    for index, (first, end, count) in enumerate(windows):
+        if not count:
+            continue
+        label, score = scores.get(index, ("neutral", 0.5))
+        timeline.append({
+            "minute": f"{first} to {end}",
+            "label": label,
+            "score": round(score, 2),
+            "message_count": count,
+        })
+    sentiment = summarize_timeline(timeline)
+    sentiment["granularity"] = f"{window_minutes}-minute"
+    return intent, root_cause, sentiment
+
+
+async def analyze_call_fast(tool_context: ToolContext) -> dict:
+    """
+    Runs the single-call fast analysis and saves intent, root cause and sentiment to the state.
+
+    Args:
+        tool_context (ToolContext): The tool context containing the transcript.
+
+    Returns:
+        dict: The intent, root cause and sentiment results.
+    """
+    transcript = tool_context.state.get("transcript")
+    if not transcript:
+        return {"error": "Transcript not found in state."}
+
+    intent, root_cause, sentiment = await analyze_call(transcript)
+    tool_context.state["intent_state"] = intent
+    tool_context.state["root_cause_state"] = root_cause
+    tool_context.state["sentiment_state"] = sentiment
+    return {"intent": intent, "root_cause": root_cause, "sentiment": sentiment}
+
+
+fast_analysis_agent = Agent(
+    name="fast_analysis_agent",
+    model=LiteLlm(model="openai/gpt-4o"),
+    description="Classifies intent, root cause and sentiment of the transcript with a single model call.",
+    instruction="""
+    You are a triage analyst for bank customer service calls.
+    You have access to the 'analyze_call_fast' tool. It reads the transcript from the state; call it to perform the analysis and save the results to the state.
+    """,
+    # The tool reads the transcript from the state, so the session history is not needed.
+    include_contents="none",
+    tools=[analyze_call_fast],
+)
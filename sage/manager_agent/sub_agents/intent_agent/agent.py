@@ -1,11 +1,41 @@
 from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.models.lite_llm import LiteLlm
+from functools import lru_cache
+import os
+from dotenv import load_dotenv
+from google.genai import types
+from ..prompt_context import build_prompt, record_usage
+from .local_classifier import INTENT_CLASSIFIER, intent_classifier
+load_dotenv()
 
-intent_agent = Agent(
-    name="IntentAgent",
-    model="gemma-3-27b-it",
-    description="Identifies the user's intent from the transcript.",
-    instruction="""
+@lru_cache(maxsize=None)
+def get_model():
+    """Returns the Gemini model used for intent classification, configuring the SDK on first call."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    return genai.GenerativeModel('gemma-3-27b-it')
+
+INTENT_CATEGORIES = [
+    "BalanceInquiry",
+    "TransactionHistory",
+    "FundTransfer",
+    "LoanApplication",
+    "LoanInquiry",
+    "CreditCardApplication",
+    "CreditCardLimitIncrease",
+    "ReportLostOrStolenCard",
+    "DisputeTransaction",
+    "AccountOpening",
+    "AccountClosure",
+    "UpdatePersonalInformation",
+    "TechnicalSupport",
+    "GeneralInquiry",
+]
+
+INTENT_INSTRUCTION = """
         You are an expert in analyzing banking call transcripts. Your task is to identify the primary intent of the customer from the provided transcript. The transcript is a list of segments, each with a speaker and their dialogue.
 
         You must classify the intent into one of the following 14 categories:
@@ -24,7 +54,7 @@ intent_agent = Agent(
         - TechnicalSupport
         - GeneralInquiry
 
-        The input you will receive is a dictionary with a 'transcription' key, which holds a list of lists. Each inner list has the format: [start_time, end_time, speaker_id, text].
+        The transcript is given above, one line per segment in the format: [minutes:seconds] speaker: text.
 
         You need to analyze the 'text' from all speakers to determine the intent.
 
@@ -33,6 +63,93 @@ intent_agent = Agent(
 
         Do not provide any other explanation or text in your response.
 
-    """,
+    """
+
+def build_intent_prompt(transcript: list) -> str:
+    """
+    Renders the shared transcript block followed by the intent instruction.
+
+    Args:
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+
+    Returns:
+        str: The complete intent prompt.
+    """
+    return build_prompt(transcript, INTENT_INSTRUCTION)
+
+def intent_instruction(context: ReadonlyContext) -> str:
+    """
+    Builds the IntentAgent instruction from the transcript in the state.
+
+    The agent runs with include_contents='none', so this prompt is all it
+    sees: no manager turns, tool responses or earlier chat.
+
+    Args:
+        context (ReadonlyContext): The invocation context holding the state.
+
+    Returns:
+        str: The intent prompt for the current transcript.
+    """
+    return build_intent_prompt(context.state.get("transcript", []))
+
+async def classify_intent(transcript: list, usage: dict = None, report: dict = None) -> str:
+    """
+    Classifies the customer's intent, locally when confident, else with a single direct model call.
+
+    With SAGE_INTENT_CLASSIFIER set to "tiered" the local classifier answers
+    first and only ambiguous calls are escalated to the model.
+
+    Args:
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+        usage (dict): Optional prompt token counts, updated under 'intent'.
+        report (dict): Optional; receives the 'source' ("local" or "llm") and
+            the local 'confidence'.
+
+    Returns:
+        str: One of the 14 intent categories.
+    """
+    if INTENT_CLASSIFIER == "tiered":
+        intent, confidence = intent_classifier.classify(transcript, INTENT_CATEGORIES)
+        if report is not None:
+            report["source"] = "local" if intent else "llm"
+            report["confidence"] = round(confidence, 3)
+        if intent:
+            return intent
+    elif report is not None:
+        report["source"] = "llm"
+
+    response = await get_model().generate_content_async(build_intent_prompt(transcript))
+    record_usage(usage, "intent", response)
+    intent = response.text.strip().strip('"').strip()
+    return intent if intent in INTENT_CATEGORIES else "GeneralInquiry"
+
+def classify_locally(callback_context: CallbackContext):
+    """
+    Answers IntentAgent from the local classifier when it is confident.
+
+    Runs before the agent; returning content skips the model call. The
+    intent is written to intent_state, where output_key would put it.
+
+    Args:
+        callback_context (CallbackContext): The callback context holding the state.
+
+    Returns:
+        types.Content: The intent, or None to let the model classify the call.
+    """
+    if INTENT_CLASSIFIER != "tiered":
+        return None
+    intent, _ = intent_classifier.classify(callback_context.state.get("transcript", []), INTENT_CATEGORIES)
+    if intent is None:
+        return None
+    callback_context.state["intent_state"] = intent
+    return types.Content(role="model", parts=[types.Part(text=intent)])
+
+intent_agent = Agent(
+    name="IntentAgent",
+    model="gemma-3-27b-it",
+    description="Identifies the user's intent from the transcript.",
+    instruction=intent_instruction,
+    include_contents="none",
+    before_agent_callback=classify_locally,
     output_key="intent_state",
-)
\ No newline at end of file
+)
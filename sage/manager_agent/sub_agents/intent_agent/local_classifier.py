@@ -0,0 +1,197 @@
+import os
+import re
+import threading
+from collections import Counter
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "tiered" answers from the local classifier when it is confident and asks the LLM otherwise;
+# "llm" always asks the LLM.
+INTENT_CLASSIFIER = os.getenv("SAGE_INTENT_CLASSIFIER", "tiered")
+# Model trained by playground/train_intent_classifier.py. Without it every call goes to the LLM.
+INTENT_MODEL_PATH = os.getenv("SAGE_INTENT_MODEL_PATH", "./intent_model.npz")
+# Lowest local probability accepted without asking the LLM.
+INTENT_MIN_CONFIDENCE = float(os.getenv("SAGE_INTENT_MIN_CONFIDENCE", "0.8"))
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> list:
+    """Splits text into lowercase word unigrams and bigrams."""
+    words = _TOKEN.findall(text.lower())
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def transcript_text(transcript: list) -> str:
+    """Joins the text of every segment, the classifier's view of a call."""
+    return " ".join(segment[3] for segment in transcript)
+
+
+class TfidfIntentModel:
+    """
+    TF-IDF features with a multinomial logistic regression, in NumPy.
+
+    Term frequencies are sublinear (1 + log tf) and each document vector is
+    L2-normalized, so call length does not dominate. The regression is
+    trained with full-batch gradient descent and an L2 penalty; its softmax
+    output is used as the confidence of a prediction.
+    """
+
+    def __init__(self, vocabulary: list, idf: np.ndarray, weights: np.ndarray, bias: np.ndarray, labels: list):
+        self.vocabulary = list(vocabulary)
+        self.index = {term: i for i, term in enumerate(self.vocabulary)}
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.labels = list(labels)
+
+    @classmethod
+    def fit(cls, texts: list, labels: list, max_features: int = 5000, min_df: int = 2,
+            iterations: int = 300, learning_rate: float = 2.0, l2: float = 1e-4) -> "TfidfIntentModel":
+        """
+        Trains a model on labelled texts.
+
+        Args:
+            texts (list): The training documents.
+            labels (list): The label of each document.
+            max_features (int): Largest vocabulary, keeping the terms found in most documents.
+            min_df (int): Terms found in fewer documents are ignored.
+            iterations (int): Gradient descent steps.
+            learning_rate (float): Gradient descent step size.
+            l2 (float): Weight penalty.
+
+        Returns:
+            TfidfIntentModel: The trained model.
+        """
+        documents = [tokenize(text) for text in texts]
+        df = Counter(term for tokens in documents for term in set(tokens))
+        terms = sorted((term for term, count in df.items() if count >= min_df), key=lambda term: (-df[term], term))
+        vocabulary = sorted(terms[:max_features])
+        idf = np.array(
+            [np.log((1 + len(documents)) / (1 + df[term])) + 1 for term in vocabulary], dtype=np.float32
+        )
+        classes = sorted(set(labels))
+        model = cls(vocabulary, idf, np.zeros((len(vocabulary), len(classes)), dtype=np.float32),
+                    np.zeros(len(classes), dtype=np.float32), classes)
+
+        features = model.vectorize(documents)
+        targets = np.zeros((len(labels), len(classes)), dtype=np.float32)
+        targets[np.arange(len(labels)), [classes.index(label) for label in labels]] = 1
+        for _ in range(iterations):
+            error = model._softmax(features) - targets
+            model.weights -= learning_rate * (features.T @ error / len(labels) + l2 * model.weights)
+            model.bias -= learning_rate * error.mean(axis=0)
+        return model
+
+    def vectorize(self, documents: list) -> np.ndarray:
+        """Turns tokenized documents into L2-normalized TF-IDF rows."""
+        features = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(documents):
+            counts = Counter(self.index[term] for term in tokens if term in self.index)
+            if counts:
+                columns = np.fromiter(counts.keys(), dtype=np.int64)
+                features[row, columns] = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32))
+        features *= self.idf
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        return features / np.maximum(norms, 1e-12)
+
+    def _softmax(self, features: np.ndarray) -> np.ndarray:
+        logits = features @ self.weights + self.bias
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, text: str) -> tuple:
+        """
+        Classifies one document.
+
+        Returns:
+            tuple: (label, probability), or (None, 0.0) when the document
+                shares no term with the vocabulary.
+        """
+        features = self.vectorize([tokenize(text)])
+        if not features.any():
+            return None, 0.0
+        probabilities = self._softmax(features)[0]
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    def save(self, path: str) -> None:
+        """Writes the model to a .npz file."""
+        np.savez(
+            path,
+            vocabulary=np.array(self.vocabulary),
+            idf=self.idf,
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfIntentModel":
+        """Reads a model written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["vocabulary"].tolist(), data["idf"], data["weights"], data["bias"], data["labels"].tolist()
+            )
+
+
+class LocalIntentClassifier:
+    """
+    In-process first tier of intent classification.
+
+    Answers when the trained model is at least `min_confidence` sure of an
+    allowed intent and otherwise tells the caller to escalate to the LLM.
+    Both outcomes are counted; stats() reports the escalation rate.
+    """
+
+    def __init__(self, model_path: str = INTENT_MODEL_PATH, min_confidence: float = INTENT_MIN_CONFIDENCE):
+        self.model_path = model_path
+        self.min_confidence = min_confidence
+        self._model = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._counts = {"local": 0, "escalated": 0}
+
+    def model(self):
+        """Loads the model on first use; returns None if no model has been trained."""
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                if os.path.exists(self.model_path):
+                    self._model = TfidfIntentModel.load(self.model_path)
+                    print(f"Loaded intent model from {self.model_path} ({len(self._model.vocabulary)} terms)")
+                else:
+                    print(f"No intent model at {self.model_path}; every call is sent to the LLM")
+            return self._model
+
+    def classify(self, transcript: list, allowed: list) -> tuple:
+        """
+        Classifies a call locally if the model is confident enough.
+
+        Args:
+            transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+            allowed (list): The intents the answer must be one of.
+
+        Returns:
+            tuple: (intent, confidence). intent is None when the call should
+                be escalated to the LLM.
+        """
+        model = self.model()
+        intent, confidence = model.predict(transcript_text(transcript)) if model else (None, 0.0)
+        accepted = intent in allowed and confidence >= self.min_confidence
+        with self._lock:
+            self._counts["local" if accepted else "escalated"] += 1
+        return (intent if accepted else None), confidence
+
+    def stats(self) -> dict:
+        """Returns how many calls were answered locally and how many were escalated."""
+        with self._lock:
+            counts = dict(self._counts)
+        total = counts["local"] + counts["escalated"]
+        counts["escalation_rate"] = round(counts["escalated"] / total, 3) if total else 0.0
+        return counts
+
+
+intent_classifier = LocalIntentClassifier()
@@ -0,0 +1,104 @@
+TRANSCRIPT_HEADER = (
+    "Transcript of a customer service call at a bank. "
+    "Each line is one segment: [minutes:seconds] speaker: text."
+)
+
+
+def render_lines(segments) -> str:
+    """
+    Renders transcript segments as one '[mm:ss] speaker: text' line each.
+
+    Args:
+        segments: [start_time, end_time, speaker_id, text] segments.
+
+    Returns:
+        str: The rendered lines.
+    """
+    return "\n".join(
+        f"[{int(start // 60):02d}:{int(start % 60):02d}] {speaker}: {text}"
+        for start, _, speaker, text in segments
+    )
+
+
+def transcript_context(transcript: list) -> str:
+    """
+    Returns the canonical transcript block that starts every analysis prompt.
+
+    Every prompt built from it starts the same way for the same transcript,
+    so the intent, root cause and report prompts read the call identically.
+
+    Args:
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+
+    Returns:
+        str: The header and the rendered transcript.
+    """
+    return f"{TRANSCRIPT_HEADER}\n\n{render_lines(transcript)}"
+
+
+def build_prompt(transcript: list, task: str) -> str:
+    """Places the task-specific instructions after the shared transcript block."""
+    return f"{transcript_context(transcript)}\n\n{task}"
+
+
+def record_usage(usage: dict, name: str, response) -> None:
+    """
+    Adds the token counts of one model response to `usage[name]`.
+
+    Reads Gemini usage_metadata and OpenAI/LiteLLM usage alike; responses
+    without usage information are counted as calls only.
+
+    Args:
+        usage (dict): Collects the counts per analysis step. Nothing is
+            recorded when it is None.
+        name (str): The analysis step, e.g. "intent".
+        response: The model response.
+    """
+    if usage is None:
+        return
+    prompt_tokens = cached_tokens = completion_tokens = 0
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is not None:
+        prompt_tokens = getattr(metadata, "prompt_token_count", 0) or 0
+        cached_tokens = getattr(metadata, "cached_content_token_count", 0) or 0
+        completion_tokens = getattr(metadata, "candidates_token_count", 0) or 0
+    else:
+        counts = getattr(response, "usage", None)
+        if counts is None and isinstance(response, dict):
+            counts = response.get("usage")
+        if counts is not None:
+            prompt_tokens = getattr(counts, "prompt_tokens", 0) or 0
+            details = getattr(counts, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", 0) or 0
+            completion_tokens = getattr(counts, "completion_tokens", 0) or 0
+
+    step = usage.setdefault(name, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0})
+    step["calls"] += 1
+    step["prompt_tokens"] += prompt_tokens
+    step["cached_tokens"] += cached_tokens
+    step["completion_tokens"] += completion_tokens
+
+
+def usage_report(usage: dict) -> dict:
+    """
+    Summarizes cached and uncached prompt tokens per analysis step and in total.
+
+    Args:
+        usage (dict): The counts collected by record_usage.
+
+    Returns:
+        dict: Per-step counts plus a 'total' entry, each with the uncached
+            token count and the cached ratio.
+    """
+    totals = {
+        key: sum(step[key] for step in usage.values())
+        for key in ("calls", "prompt_tokens", "cached_tokens", "completion_tokens")
+    }
+    return {
+        name: {
+            **step,
+            "uncached_tokens": step["prompt_tokens"] - step["cached_tokens"],
+            "cached_ratio": round(step["cached_tokens"] / step["prompt_tokens"], 3) if step["prompt_tokens"] else 0.0,
+        }
+        for name, step in {**usage, "total": totals}.items()
+    }
@@ -3,13 +3,19 @@ import re
 from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools.tool_context import ToolContext
-import google.generativeai as genai
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
+from ..prompt_context import build_prompt, record_usage
 load_dotenv()
 
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel('gemma-3-27b-it')
+@lru_cache(maxsize=None)
+def get_model():
+    """Returns the Gemini model used for root cause analysis, configuring the SDK on first call."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    return genai.GenerativeModel('gemma-3-27b-it')
 
 def safe_parse_json(raw):
     """Safely parse model output even if wrapped in markdown."""
@@ -19,7 +25,32 @@ def safe_parse_json(raw):
     except json.JSONDecodeError:
         return None
 
-def analyze_root_cause(tool_context: ToolContext) -> dict:
+ROOT_CAUSE_INSTRUCTION = """Analyze the conversation above and identify the root cause of the customer's issue. 
+    The root cause should be a concise summary of the underlying problem.
+    
+    Respond with a JSON object with a single key 'root_cause'.
+    """
+
+async def find_root_cause(transcript: list, usage: dict = None) -> dict:
+    """
+    Identifies the root cause of the customer's issue with a single model call.
+
+    Args:
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+        usage (dict): Optional prompt token counts, updated under 'root_cause'.
+
+    Returns:
+        dict: The parsed model output with a 'root_cause' key.
+    """
+    response = await get_model().generate_content_async(build_prompt(transcript, ROOT_CAUSE_INSTRUCTION))
+    record_usage(usage, "root_cause", response)
+    try:
+        root_cause = safe_parse_json(response.text)
+    except Exception as e:
+        root_cause = {"error": str(e)}
+    return root_cause
+
+async def analyze_root_cause(tool_context: ToolContext) -> dict:
     """
     Analyzes the transcript to identify the root cause of the user's issue.
 
@@ -33,23 +64,7 @@ def analyze_root_cause(tool_context: ToolContext) -> dict:
     if not transcript:
         return {"error": "Transcript not found in state."}
 
-    full_text = " ".join(segment[3] for segment in transcript)
-
-    prompt = f"""Analyze the following conversation from a customer service call and identify the root cause of the customer's issue. 
-    The root cause should be a concise summary of the underlying problem.
-    
-    Conversation:
-    {full_text}
-    
-    Respond with a JSON object with a single key 'root_cause'.
-    """
-
-    response = model.generate_content(prompt)
-    try:
-        root_cause = safe_parse_json(response.text)
-    except Exception as e:
-        root_cause = {"error": str(e)}
-
+    root_cause = await find_root_cause(transcript)
     tool_context.state["root_cause_state"] = root_cause
     return {"root_cause": root_cause}
 
@@ -59,9 +74,11 @@ root_cause_agent = Agent(
     description="Identifies the root cause of the user's issue from the transcript.",
     instruction="""
     You are an expert in root cause analysis for customer service calls.
-    Your task is to analyze the provided call transcript to identify the underlying problem or recurring pain points.
-    You have access to the 'analyze_root_cause' tool. Call this tool to perform the analysis and save the result to the state.
+    Your task is to analyze the call transcript to identify the underlying problem or recurring pain points.
+    You have access to the 'analyze_root_cause' tool. It reads the transcript from the state; call it to perform the analysis and save the result to the state.
     
     """,
+    # The tool reads the transcript from the state, so the session history is not needed.
+    include_contents="none",
     tools=[analyze_root_cause],
 )
@@ -1,18 +1,50 @@
 from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools.tool_context import ToolContext
-import google.generativeai as genai
+import asyncio
 import math
 import os
 import json
 import re
 from collections import defaultdict, Counter
-from litellm import completion
+from litellm import acompletion
 from dotenv import load_dotenv
+from ..prompt_context import record_usage, render_lines
+from .lexicon import SENTIMENT_SCORER, score_text
 load_dotenv()
 
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel('gemma-3-27b-it')
+SENTIMENT_CONCURRENCY = int(os.getenv("SAGE_SENTIMENT_CONCURRENCY", "8"))
+SENTIMENT_MAX_RETRIES = int(os.getenv("SAGE_SENTIMENT_MAX_RETRIES", "2"))
+SENTIMENT_RETRY_BACKOFF = 1.0
+# "per_minute" sends one request per minute bucket, "batched" groups buckets into one request.
+SENTIMENT_MODE = os.getenv("SAGE_SENTIMENT_MODE", "per_minute")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SAGE_SENTIMENT_BATCH_SIZE", "0"))
+
+SENTIMENT_SYSTEM_PROMPT = (
+    "You are a precise emotion detection model for customer conversations. "
+    "Analyze the following 1-minute transcript and identify the *dominant emotion* clearly. "
+    "Differentiate carefully between: "
+    "Anger (aggressive, raised voice), "
+    "Frustration (annoyed or impatient tone), "
+    "Calm (neutral or polite tone), "
+    "Apology (expressing regret), and "
+    "Satisfaction (happy or thankful tone). "
+    "Return only JSON: {\"label\": <emotion>, \"score\": <0-1>}."
+)
+
+SENTIMENT_BATCH_SYSTEM_PROMPT = (
+    "You are a precise emotion detection model for customer conversations. "
+    "You will receive several 1-minute transcript blocks, each introduced by 'Minute <n>:'. "
+    "For every block identify the *dominant emotion* clearly. "
+    "Differentiate carefully between: "
+    "Anger (aggressive, raised voice), "
+    "Frustration (annoyed or impatient tone), "
+    "Calm (neutral or polite tone), "
+    "Apology (expressing regret), and "
+    "Satisfaction (happy or thankful tone). "
+    "Return only a JSON array with one object per block: "
+    "[{\"minute\": <n>, \"label\": <emotion>, \"score\": <0-1>}, ...]."
+)
 
 def safe_parse_json(raw):
     """Safely parse model output even if wrapped in markdown."""
@@ -22,58 +54,84 @@ def safe_parse_json(raw):
     except json.JSONDecodeError:
         return None
 
-def analyze_sentiment_per_minute(tool_context: ToolContext) -> dict:
-    """
-    Analyzes the emotional tone and satisfaction level of the transcript per minute and saves it to the state.
-    """
-    transcript = tool_context.state.get("transcript")
-    if not transcript:
-        return {"error": "Transcript not found in state."}
-
+def bucket_by_minute(transcript: list) -> dict:
+    """Groups segments by the minute they start in."""
     minute_buckets = defaultdict(list)
     for entry in transcript:
         start_t, end_t, speaker, text = entry
         minute_index = int(math.floor(start_t / 60))
-        minute_buckets[minute_index].append((speaker, text))
+        minute_buckets[minute_index].append(entry)
+    return minute_buckets
 
-    minute_summary = []
-    for minute, msgs in sorted(minute_buckets.items()):
-        combined_text = " ".join([f"{speaker}: {text}" for speaker, text in msgs])
+async def score_minute(msgs: list, usage: dict = None) -> tuple:
+    """
+    Scores the dominant emotion of one minute of conversation.
 
-        resp = completion(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a precise emotion detection model for customer conversations. "
-                        "Analyze the following 1-minute transcript and identify the *dominant emotion* clearly. "
-                        "Differentiate carefully between: "
-                        "Anger (aggressive, raised voice), "
-                        "Frustration (annoyed or impatient tone), "
-                        "Calm (neutral or polite tone), "
-                        "Apology (expressing regret), and "
-                        "Satisfaction (happy or thankful tone). "
-                        "Return only JSON: {\"label\": <emotion>, \"score\": <0-1>}."
-                    ),
-                },
-                {"role": "user", "content": combined_text},
-            ],
-        )
+    Transient API errors and unparseable replies are retried with exponential
+    backoff; a bucket that still fails falls back to a neutral score so one bad
+    minute does not sink the whole timeline.
 
+    Args:
+        msgs (list): The segments of the minute.
+        usage (dict): Optional prompt token counts, updated under 'sentiment'.
+
+    Returns:
+        tuple: The (label, score) of the minute.
+    """
+    combined_text = render_lines(msgs)
+
+    parsed = None
+    for attempt in range(SENTIMENT_MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(SENTIMENT_RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            resp = await acompletion(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": SENTIMENT_SYSTEM_PROMPT},
+                    {"role": "user", "content": combined_text},
+                ],
+            )
+        except Exception as e:
+            print(f"Sentiment scoring attempt {attempt + 1} failed: {e}")
+            continue
+        record_usage(usage, "sentiment", resp)
         raw = resp["choices"][0]["message"]["content"]
         parsed = safe_parse_json(raw)
-        label = parsed.get("label", "neutral") if parsed else "neutral"
-        score = float(parsed.get("score", 0.5)) if parsed else 0.5
-        
-        minute_label = f"{minute} to {minute + 1}"
-        minute_summary.append({
-            "minute": minute_label,
-            "label": label,
-            "score": round(score, 2),
-            "message_count": len(msgs)
-        })
+        if parsed:
+            break
+
+    label = parsed.get("label", "neutral") if parsed else "neutral"
+    score = float(parsed.get("score", 0.5)) if parsed else 0.5
+    return label, score
 
+def score_locally(msgs: list):
+    """
+    Scores a minute with the local lexicon scorer when SAGE_SENTIMENT_SCORER is "tiered".
+
+    Args:
+        msgs (list): The segments of the minute.
+
+    Returns:
+        tuple: The (label, score) of the minute, or None when the local scorer
+            is uncertain or disabled and the minute should go to the LLM.
+    """
+    if SENTIMENT_SCORER != "tiered":
+        return None
+    label, score, confident = score_text(" ".join(segment[3] for segment in msgs))
+    return (label, score) if confident else None
+
+def timeline_entry(minute: int, msgs: list, label: str, score: float) -> dict:
+    """Builds the timeline entry of one scored minute."""
+    return {
+        "minute": f"{minute} to {minute + 1}",
+        "label": label,
+        "score": round(score, 2),
+        "message_count": len(msgs)
+    }
+
+def summarize_timeline(minute_summary: list) -> dict:
+    """Derives the overall sentiment from an ordered per-minute timeline."""
     label_counts = Counter(m["label"] for m in minute_summary)
     score_totals = defaultdict(float)
     for m in minute_summary:
@@ -83,13 +141,194 @@ def analyze_sentiment_per_minute(tool_context: ToolContext) -> dict:
     overall_label = max(label_counts, key=label_counts.get)
     overall_score = round(avg_scores[overall_label], 2)
 
-    result = {
+    return {
         "sentiment_overall": overall_label,
         "overall_score": overall_score,
         "granularity": "1-minute",
         "timeline": minute_summary
     }
 
+async def score_minute_batch(batch: list, usage: dict = None) -> dict:
+    """
+    Scores several minutes of conversation with a single request.
+
+    Args:
+        batch (list): The (minute, msgs) pairs to score.
+        usage (dict): Optional prompt token counts, updated under 'sentiment'.
+
+    Returns:
+        dict: Maps each minute the model answered for to its (label, score).
+            Minutes missing from the reply or with malformed entries are left
+            out so the caller can score them individually.
+    """
+    expected = {minute for minute, _ in batch}
+    blocks = []
+    for minute, msgs in batch:
+        blocks.append(f"Minute {minute}:\n{render_lines(msgs)}")
+
+    try:
+        resp = await acompletion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": SENTIMENT_BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": "\n\n".join(blocks)},
+            ],
+        )
+    except Exception as e:
+        print(f"Batched sentiment scoring failed: {e}")
+        return {}
+    record_usage(usage, "sentiment", resp)
+
+    raw = resp["choices"][0]["message"]["content"]
+    parsed = safe_parse_json(raw)
+    if not isinstance(parsed, list):
+        return {}
+
+    results = {}
+    for item in parsed:
+        try:
+            minute = int(item["minute"])
+            label = item["label"]
+            score = float(item["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if minute in expected and isinstance(label, str):
+            results[minute] = (label, score)
+    return results
+
+async def score_sentiment(transcript: list, concurrency: int = None, mode: str = None, batch_size: int = None,
+                          usage: dict = None) -> dict:
+    """
+    Scores the emotional tone of the transcript for each 1-minute bucket.
+
+    In tiered scoring the local lexicon scorer settles the clear-cut minutes
+    and only the uncertain ones are sent to the model. In "per_minute" mode
+    every bucket is its own request. In "batched" mode buckets are sent in
+    groups of `batch_size` (all of them when 0) and only the buckets missing
+    from a group's reply are re-scored individually.
+    Requests run concurrently, with at most `concurrency` in flight, and the
+    timeline is reassembled in minute order.
+
+    Args:
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+        concurrency (int): Maximum concurrent scoring requests. Defaults to
+            SAGE_SENTIMENT_CONCURRENCY.
+        mode (str): "per_minute" or "batched". Defaults to SAGE_SENTIMENT_MODE.
+        batch_size (int): Minutes per batched request. Defaults to
+            SAGE_SENTIMENT_BATCH_SIZE.
+        usage (dict): Optional prompt token counts, updated under 'sentiment'.
+
+    Returns:
+        dict: The overall sentiment, the per-minute timeline and how many
+            minutes were scored locally and by the model.
+    """
+    semaphore = asyncio.Semaphore(concurrency or SENTIMENT_CONCURRENCY)
+    minute_buckets = sorted(bucket_by_minute(transcript).items())
+    scores = {}
+    for minute, msgs in minute_buckets:
+        local = score_locally(msgs)
+        if local:
+            scores[minute] = local
+    local_minutes = len(scores)
+    pending = [(minute, msgs) for minute, msgs in minute_buckets if minute not in scores]
+
+    if pending and (mode or SENTIMENT_MODE) == "batched":
+        size = batch_size or SENTIMENT_BATCH_SIZE or len(pending)
+
+        async def score_batch(batch):
+            async with semaphore:
+                return await score_minute_batch(batch, usage)
+
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+        for batch_scores in await asyncio.gather(*(score_batch(batch) for batch in batches)):
+            scores.update(batch_scores)
+
+    async def score_bucket(msgs):
+        async with semaphore:
+            return await score_minute(msgs, usage)
+
+    missing = [(minute, msgs) for minute, msgs in minute_buckets if minute not in scores]
+    fallback = await asyncio.gather(*(score_bucket(msgs) for _, msgs in missing))
+    scores.update({minute: result for (minute, _), result in zip(missing, fallback)})
+
+    minute_summary = [
+        timeline_entry(minute, msgs, *scores[minute])
+        for minute, msgs in minute_buckets
+    ]
+    result = summarize_timeline(minute_summary)
+    result["scorer"] = {"local": local_minutes, "llm": len(minute_buckets) - local_minutes}
+    return result
+
+class StreamingSentimentScorer:
+    """
+    Scores minute buckets while the transcript is still being produced.
+
+    Segments are fed in timeline order. As soon as a segment starts in a later
+    minute, every earlier bucket is closed and its scoring request starts in
+    the background, at most `concurrency` at a time. Minutes the local
+    lexicon scorer is sure about are settled without a request. A segment
+    that arrives late for a closed minute, e.g. from the overlap between two
+    chunks, reopens it: the minute is scored again with the whole bucket.
+    """
+
+    def __init__(self, concurrency: int = None, usage: dict = None):
+        self._usage = usage
+        self._sources = {}
+        self._semaphore = asyncio.Semaphore(concurrency or SENTIMENT_CONCURRENCY)
+        self._buckets = defaultdict(list)
+        self._tasks = {}
+
+    def add(self, segments: list) -> None:
+        """Adds transcript segments and starts scoring the buckets they close."""
+        for minute, msgs in bucket_by_minute(segments).items():
+            self._buckets[minute].extend(msgs)
+            if minute in self._tasks:
+                self._tasks.pop(minute).cancel()
+        if self._buckets:
+            self._close_before(max(self._buckets))
+
+    async def finish(self) -> dict:
+        """Closes the remaining buckets and returns the sentiment result."""
+        if self._buckets:
+            self._close_before(max(self._buckets) + 1)
+        minute_summary = await asyncio.gather(
+            *(task for _, task in sorted(self._tasks.items()))
+        )
+        result = summarize_timeline(list(minute_summary))
+        local_minutes = sum(1 for minute in self._tasks if self._sources[minute] == "local")
+        result["scorer"] = {"local": local_minutes, "llm": len(self._tasks) - local_minutes}
+        return result
+
+    def cancel(self) -> None:
+        """Cancels every scoring request still in flight."""
+        for task in self._tasks.values():
+            task.cancel()
+
+    def _close_before(self, minute: int) -> None:
+        for closed in sorted(m for m in self._buckets if m < minute and m not in self._tasks):
+            self._tasks[closed] = asyncio.create_task(
+                self._score(closed, sorted(self._buckets[closed], key=lambda segment: segment[0]))
+            )
+
+    async def _score(self, minute: int, msgs: list) -> dict:
+        local = score_locally(msgs)
+        if local:
+            self._sources[minute] = "local"
+            return timeline_entry(minute, msgs, *local)
+        async with self._semaphore:
+            label, score = await score_minute(msgs, self._usage)
+        self._sources[minute] = "llm"
+        return timeline_entry(minute, msgs, label, score)
+
+async def analyze_sentiment_per_minute(tool_context: ToolContext) -> dict:
+    """
+    Analyzes the emotional tone and satisfaction level of the transcript per minute and saves it to the state.
+    """
+    transcript = tool_context.state.get("transcript")
+    if not transcript:
+        return {"error": "Transcript not found in state."}
+
+    result = await score_sentiment(transcript)
     tool_context.state["sentiment_state"] = result
     return result
 
@@ -99,9 +338,11 @@ sentiment_agent = Agent(
     description="Analyzes the emotional tone and satisfaction levels in the transcript.",
     instruction="""
     You are a sentiment analysis expert specializing in customer service calls.
-    Your task is to analyze the provided call transcript to identify the emotional tone and satisfaction levels for each minute of the call.
-    You have access to the 'analyze_sentiment_per_minute' tool. Call this tool to perform the analysis and save the results to the state.
+    Your task is to analyze the call transcript to identify the emotional tone and satisfaction levels for each minute of the call.
+    You have access to the 'analyze_sentiment_per_minute' tool. It reads the transcript from the state; call it to perform the analysis and save the results to the state.
     
     """,
+    # The tool reads the transcript from the state, so the session history is not needed.
+    include_contents="none",
     tools=[analyze_sentiment_per_minute],
 )
\ No newline at end of file
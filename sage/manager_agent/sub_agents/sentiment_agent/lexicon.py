@@ -0,0 +1,148 @@
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "tiered" scores each minute with the local lexicon and sends only uncertain minutes to the LLM;
+# "llm" sends every minute to the LLM.
+SENTIMENT_SCORER = os.getenv("SAGE_SENTIMENT_SCORER", "tiered")
+# A local label is kept when its share of the evidence is at least this high...
+SENTIMENT_MIN_CONFIDENCE = float(os.getenv("SAGE_SENTIMENT_MIN_CONFIDENCE", "0.6"))
+# ...and at least this far ahead of the runner-up label.
+SENTIMENT_MIN_MARGIN = float(os.getenv("SAGE_SENTIMENT_MIN_MARGIN", "0.25"))
+# A label other than Calm also needs this much cue weight, so one weak cue in a short
+# minute ("Sorry, one moment please.") is sent to the LLM instead of deciding it.
+SENTIMENT_MIN_EVIDENCE = float(os.getenv("SAGE_SENTIMENT_MIN_EVIDENCE", "2.0"))
+
+LABELS = ["Anger", "Frustration", "Calm", "Apology", "Satisfaction"]
+
+# Cue phrases and their weight per label. Phrases match on word boundaries, case-insensitively.
+LEXICON = {
+    "Anger": {
+        "unacceptable": 2.0, "ridiculous": 2.0, "outrageous": 2.0, "furious": 2.0, "angry": 1.5,
+        "pathetic": 2.0, "incompetent": 2.0, "worst": 1.5, "scam": 2.0, "lawyer": 2.0, "sue": 1.5,
+        "disgusting": 2.0, "shut up": 2.0, "damn": 1.5, "hell": 1.0, "useless": 1.5,
+        "speak to your manager": 1.5, "close my account": 1.0,
+    },
+    "Frustration": {
+        "frustrated": 2.0, "frustrating": 2.0, "annoying": 1.5, "annoyed": 1.5,
+        "already told": 1.5, "third time": 1.5, "second time": 1.0, "how long": 1.0,
+        "still waiting": 1.0, "waiting": 0.5, "on hold": 1.0, "not working": 1.0, "doesn't work": 1.0,
+        "nobody": 1.0, "no one": 1.0, "come on": 1.0, "seriously": 1.0,
+    },
+    "Apology": {
+        "sorry": 1.0, "apologize": 1.5, "apologies": 1.5, "my apologies": 1.5, "regret": 1.0,
+        "inconvenience": 1.0, "unfortunately": 0.5, "my mistake": 1.5, "our mistake": 1.5,
+    },
+    "Satisfaction": {
+        "thank you so much": 2.0, "thanks so much": 2.0, "appreciate": 1.5, "great": 0.5,
+        "perfect": 1.5, "wonderful": 1.5, "excellent": 1.5, "awesome": 1.5, "amazing": 1.5,
+        "helpful": 1.0, "relief": 1.5, "glad": 1.0, "happy": 1.0, "that's all i needed": 1.5,
+    },
+}
+# Calm is the absence of cues: its evidence grows with the number of words in the minute.
+# Routine politeness ("thanks for calling") and words agents use in any tone ("still", "again")
+# are deliberately not cues.
+CALM_WEIGHT_PER_WORD = 0.04
+# Shouting and exclamations count towards Anger, a negated positive cue towards Frustration.
+# Shouting is a run of at least MIN_SHOUTED_RUN all-caps words; CAPS_WEIGHT applies per word.
+CAPS_WEIGHT = 0.5
+MIN_SHOUTED_RUN = 2
+EXCLAMATION_WEIGHT = 0.3
+NEGATED_POSITIVE_WEIGHT = 1.5
+
+# All-caps words that are written that way in calm speech too; they never count as shouting.
+ACRONYMS = frozenset({
+    "ACH", "AM", "AMEX", "APR", "APY", "ATM", "BIC", "CD", "CVC", "CVV", "DOB", "EFT", "EMI",
+    "FAQ", "FDIC", "FICO", "HELOC", "IBAN", "ID", "IRA", "IRS", "KYC", "LLC", "NSF", "OK",
+    "OTP", "PDF", "PIN", "PM", "POS", "SMS", "SSN", "SWIFT", "UK", "US", "USA", "VISA", "ZIP",
+})
+
+_PATTERNS = {
+    label: [(re.compile(rf"\b{re.escape(phrase)}\b"), weight) for phrase, weight in cues.items()]
+    for label, cues in LEXICON.items()
+}
+_WORD = re.compile(r"[A-Za-z']+")
+_NEGATED_POSITIVE = re.compile(r"\b(?:not|never|isn't|wasn't|no)\s+(?:very\s+)?(?:happy|great|helpful|good|glad)\b")
+
+
+def shouted_words(words: list) -> int:
+    """
+    Counts the words in runs of MIN_SHOUTED_RUN or more all-caps words.
+
+    Acronyms from ACRONYMS end a run, so "my ATM PIN" is calm while "I WANT
+    MY MONEY BACK" is shouting. Single capitals such as "I" neither count
+    nor end a run.
+
+    Args:
+        words (list): The words of the minute, in order.
+
+    Returns:
+        int: The number of shouted words.
+    """
+    shouted = run = 0
+    for word in words:
+        if word.isupper() and word not in ACRONYMS:
+            run += len(word) > 1
+            continue
+        shouted += run if run >= MIN_SHOUTED_RUN else 0
+        run = 0
+    return shouted + (run if run >= MIN_SHOUTED_RUN else 0)
+
+
+def minute_evidence(text: str) -> dict:
+    """
+    Weighs the lexicon cues and surface features of one minute of text.
+
+    Args:
+        text (str): The text of the minute's segments, without speaker labels.
+
+    Returns:
+        dict: Evidence per label, before normalization.
+    """
+    lowered = text.lower()
+    words = _WORD.findall(text)
+    evidence = {label: 0.0 for label in LABELS}
+    for label, patterns in _PATTERNS.items():
+        for pattern, weight in patterns:
+            evidence[label] += weight * len(pattern.findall(lowered))
+
+    negated = len(_NEGATED_POSITIVE.findall(lowered))
+    evidence["Frustration"] += NEGATED_POSITIVE_WEIGHT * negated
+    evidence["Satisfaction"] = max(0.0, evidence["Satisfaction"] - NEGATED_POSITIVE_WEIGHT * negated)
+    evidence["Anger"] += CAPS_WEIGHT * shouted_words(words) + EXCLAMATION_WEIGHT * text.count("!")
+    evidence["Calm"] += CALM_WEIGHT_PER_WORD * len(words)
+    return evidence
+
+
+def score_text(text: str, min_confidence: float = SENTIMENT_MIN_CONFIDENCE,
+               min_margin: float = SENTIMENT_MIN_MARGIN, min_evidence: float = SENTIMENT_MIN_EVIDENCE) -> tuple:
+    """
+    Scores one minute locally and decides whether the LLM is needed.
+
+    The evidence of each label is normalized into a share of the total. The
+    minute is settled locally when the leading label's share is at least
+    `min_confidence` and at least `min_margin` ahead of the runner-up, and,
+    unless the label is Calm, its cues weigh at least `min_evidence`;
+    otherwise it sits near a label boundary, or rests on too little
+    evidence, and should be escalated.
+
+    Args:
+        text (str): The text of the minute's segments, without speaker labels.
+        min_confidence (float): Smallest share accepted for the leading label.
+        min_margin (float): Smallest lead over the runner-up.
+        min_evidence (float): Smallest cue weight accepted for a label other than Calm.
+
+    Returns:
+        tuple: (label, score, confident), with the share of the leading
+            label as the score.
+    """
+    evidence = minute_evidence(text)
+    total = sum(evidence.values())
+    if total == 0:
+        return "Calm", 0.5, False
+    ranked = sorted(((value / total, label) for label, value in evidence.items()), reverse=True)
+    (share, label), (runner_up, _) = ranked[0], ranked[1]
+    enough_evidence = label == "Calm" or evidence[label] >= min_evidence
+    return label, share, share >= min_confidence and share - runner_up >= min_margin and enough_evidence
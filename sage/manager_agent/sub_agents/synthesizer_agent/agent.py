@@ -1,31 +1,36 @@
 from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools.tool_context import ToolContext
-import google.generativeai as genai
+from functools import lru_cache
 import os
 import json
 from dotenv import load_dotenv
+from ..prompt_context import build_prompt, record_usage
 load_dotenv()
 
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel('gemini-2.0-flash')
+@lru_cache(maxsize=None)
+def get_model():
+    """Returns the Gemini model used for report writing, configuring the SDK on first call."""
+    import google.generativeai as genai
 
-def generate_summary_report(tool_context: ToolContext) -> dict:
+    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+    return genai.GenerativeModel('gemini-2.0-flash')
+
+async def build_summary_report(intent, root_cause, sentiment_details, transcript: list, usage: dict = None) -> str:
     """
-    Generates a final summary report based on the analysis from other agents.
+    Builds the final summary report from the analysis results.
 
     Args:
-        tool_context (ToolContext): The tool context containing the analysis results.
+        intent: The identified customer intent.
+        root_cause: The identified root cause.
+        sentiment_details: The per-minute sentiment analysis.
+        transcript (list): A list of [start_time, end_time, speaker_id, text] segments.
+        usage (dict): Optional prompt token counts, updated under 'report'.
 
     Returns:
-        dict: A dictionary containing the final summary report.
+        str: The summary report in markdown.
     """
-    intent = tool_context.state.get("intent_state", "Not available")
-    root_cause = tool_context.state.get("root_cause_state", "Not available")
-    sentiment_details = tool_context.state.get("sentiment_state", [])
-    transcript = tool_context.state.get("transcript", [])
-
-    prompt = f"""Generate a comprehensive summary report for the following customer service call.
+    task = f"""Generate a comprehensive summary report for the customer service call above.
     The report should be well-structured and include the following sections:
     1.  **Intent:** The customer's primary reason for calling.
     2.  **Root Cause:** The underlying issue or problem.
@@ -35,14 +40,30 @@ def generate_summary_report(tool_context: ToolContext) -> dict:
     **Intent:** {intent}
     **Root Cause:** {root_cause}
     **Sentiment Details:** {json.dumps(sentiment_details, indent=2)}
-    **Transcript:**
-    {"\n".join([f"{s[2]}: {s[3]}" for s in transcript])}
 
     Generate a detailed report based on this information.
     """
 
-    response = model.generate_content(prompt)
-    summary = response.text.strip()
+    response = await get_model().generate_content_async(build_prompt(transcript, task))
+    record_usage(usage, "report", response)
+    return response.text.strip()
+
+async def generate_summary_report(tool_context: ToolContext) -> dict:
+    """
+    Generates a final summary report based on the analysis from other agents.
+
+    Args:
+        tool_context (ToolContext): The tool context containing the analysis results.
+
+    Returns:
+        dict: A dictionary containing the final summary report.
+    """
+    intent = tool_context.state.get("intent_state", "Not available")
+    root_cause = tool_context.state.get("root_cause_state", "Not available")
+    sentiment_details = tool_context.state.get("sentiment_state", [])
+    transcript = tool_context.state.get("transcript", [])
+
+    summary = await build_summary_report(intent, root_cause, sentiment_details, transcript)
 
     tool_context.state["analysis_report"] = summary
     return {"analysis_report": summary}
@@ -59,5 +80,7 @@ synthesizer_agent = Agent(
     You have access to the following tools:
     - `generate_summary_report`: Call this tool to generate the final report.
     """,
+    # The upstream results come in through the instruction; only the current turn is kept.
+    include_contents="none",
     tools=[generate_summary_report]
 )